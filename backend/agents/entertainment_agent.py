@@ -2,28 +2,227 @@
 Entertainment Agent - Specialist for entertainment content using Giphy and TMDb APIs
 """
 
+import asyncio
+import logging
+import random
+import weakref
 import httpx
-from typing import Dict, Any, List
-import sys
-import os
+import orjson
+from cachetools import TTLCache
+from typing import Dict, Any, List, Optional, Tuple, Callable, Awaitable
 
-# Add project root to path for imports
-project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-sys.path.append(project_root)
-
-from backend.core.base_agent import BaseAgent
-from backend.core.groq_client import groq_client
+from ..core.base_agent import BaseAgent
+from ..core.groq_client import groq_client
 from config.settings import settings
 
+# Shared random source for search-term, offset and page selection
+_RNG = random.Random()
+
+# Upstream statuses worth retrying, and the total backoff budget per request (seconds)
+_RETRY_STATUS_CODES = frozenset({429, 502, 503, 504})
+_MAX_RETRY_WAIT = 10.0
+
+# Process-wide HTTP client and API page caches, shared by every EntertainmentAgent
+# instance so they all draw from one connection pool. The client is created lazily
+# and closed by EntertainmentAgent.aclose() on app shutdown.
+_SHARED_CLIENT: Optional[httpx.AsyncClient] = None
+_CLIENT_LOCK = asyncio.Lock()
+
+# Short-lived caches for raw API pages - results barely change within minutes
+_SHARED_GIF_CACHE = TTLCache(maxsize=512, ttl=600)
+_SHARED_MOVIE_CACHE = TTLCache(maxsize=512, ttl=1800)
+# Per-key fetch locks - weak, so a lock disappears once no request is holding or waiting on it
+_CACHE_LOCKS: weakref.WeakValueDictionary[tuple, asyncio.Lock] = weakref.WeakValueDictionary()
+
+# Cap in-flight upstream calls so bursts queue instead of tripping rate limits
+_GIPHY_SEM = asyncio.Semaphore(settings.giphy_max_concurrency)
+_TMDB_SEM = asyncio.Semaphore(settings.tmdb_max_concurrency)
+
+# Static mood lookup tables, built once at import time
+_MOOD_GIF_TERMS: Dict[str, Tuple[str, ...]] = {
+    "happy": ("happy", "celebration", "joy", "dance", "smile", "cheerful", "excited", "yay"),
+    "sad": ("comfort", "hug", "cute animals", "support", "cheer up", "better days", "hope", "love"),
+    "angry": ("calm down", "chill", "relax", "meditation", "breathe", "peace", "zen", "cool down"),
+    "excited": ("excited", "party", "celebration", "wow", "amazing", "awesome", "yes", "victory"),
+    "tired": ("coffee", "sleep", "rest", "cozy", "nap", "energy", "tired", "yawn"),
+    "stressed": ("relax", "meditation", "calm", "peace", "stress relief", "breathe", "zen", "chill"),
+    "lonely": ("friendship", "love", "support", "care", "together", "friends", "hug", "connection"),
+    "confused": ("thinking", "question", "hmm", "wonder", "confused", "what", "mind blown", "puzzled"),
+    "grateful": ("thank you", "grateful", "appreciation", "love", "blessed", "thankful", "heart", "gratitude"),
+    "motivated": ("motivation", "success", "goal", "achievement", "you can do it", "strong", "power", "determination"),
+    "bored": ("fun", "entertainment", "interesting", "surprise", "random", "cool", "weird", "funny"),
+    "anxious": ("calm", "relax", "peace", "breathe", "anxiety relief", "comfort", "safe", "okay"),
+    "romantic": ("love", "romance", "heart", "cute couple", "sweet", "kiss", "adorable", "valentine"),
+    "nostalgic": ("memories", "nostalgia", "old times", "vintage", "classic", "throwback", "remember", "past"),
+    "energetic": ("energy", "active", "sports", "workout", "dynamic", "power", "strong", "go"),
+    "thoughtful": ("thinking", "deep", "philosophical", "wisdom", "contemplation", "reflection", "mind", "idea"),
+    "playful": ("play", "fun", "silly", "games", "laugh", "humor", "joke", "entertaining"),
+    "neutral": ("good vibes", "positive", "nice", "pleasant", "okay", "fine", "alright", "normal")
+}
+
+# For high intensity, prefer more energetic terms
+_MOOD_GIF_TERMS_HIGH: Dict[str, Tuple[str, ...]] = {
+    mood: tuple("very " + term for term in terms[:3]) + terms
+    for mood, terms in _MOOD_GIF_TERMS.items()
+}
+
+# For low intensity, prefer calmer terms
+_MOOD_GIF_TERMS_LOW: Dict[str, Tuple[str, ...]] = {
+    mood: tuple("gentle " + term for term in terms[:3]) + terms
+    for mood, terms in _MOOD_GIF_TERMS.items()
+}
+
+# TMDb Genre IDs - multiple options per mood
+_MOOD_MOVIE_GENRES: Dict[str, Tuple[str, ...]] = {
+    "happy": ("35", "16", "10751"),     # Comedy, Animation, Family
+    "sad": ("18", "10749"),             # Drama, Romance
+    "excited": ("28", "12", "878"),     # Action, Adventure, Sci-Fi
+    "romantic": ("10749", "35"),        # Romance, Comedy
+    "scared": ("27", "53"),             # Horror, Thriller
+    "adventurous": ("12", "28", "14"),  # Adventure, Action, Fantasy
+    "thoughtful": ("18", "99", "36"),   # Drama, Documentary, History
+    "nostalgic": ("36", "10402", "18"), # History, Music, Drama
+    "energetic": ("28", "80", "9648"),  # Action, Crime, Mystery
+    "relaxed": ("35", "10770"),         # Comedy, TV Movie
+    "bored": ("28", "12", "878"),       # Action, Adventure, Sci-Fi
+    "anxious": ("35", "16"),            # Comedy, Animation
+    "angry": ("28", "80"),              # Action, Crime
+    "neutral": ("35", "18", "28")       # Comedy, Drama, Action
+}
+
+# Moods with a dedicated GIF or movie mapping; anything else is treated as neutral
+_VALID_MOODS = frozenset(_MOOD_GIF_TERMS) | frozenset(_MOOD_MOVIE_GENRES)
+
+# Jokes and quotes per mood, with their result objects prebuilt so each
+# request only copies a list of references
+_MOOD_JOKES: Dict[str, Tuple[str, ...]] = {
+    "sad": (
+        "Kenapa ikan nggak pernah sedih? Soalnya dia selalu swimming in the good vibes! 🐠",
+        "Hari yang buruk bukan berarti hidup yang buruk. Besok adalah halaman baru! 📖"
+    ),
+    "happy": (
+        "Kenapa senyum itu gratis? Karena kebahagiaan nggak boleh dikenakan pajak! 😄",
+        "Hari ini adalah hari yang sempurna untuk bahagia! ✨"
+    ),
+    "angry": (
+        "Marah itu kayak memegang bara api untuk dilempar ke orang lain - yang kepanasan duluan kita sendiri 🔥",
+        "Take a deep breath... Sekarang hitung sampai 10... Masih marah? Hitung lagi! 😅"
+    ),
+    "stressed": (
+        "Kenapa komputer nggak pernah stress? Soalnya dia bisa di-restart! Kita juga bisa kok 💻",
+        "Stress itu kayak rocking chair - banyak gerakan tapi nggak kemana-mana 🪑"
+    ),
+    "default": (
+        "Hidup itu seperti kopi - bisa pahit, tapi bisa juga dibuat manis sesuai selera! ☕",
+        "Senyum adalah makeup terbaik yang bisa kamu pakai hari ini! 😊"
+    )
+}
+
+_MOOD_JOKE_RESULTS: Dict[str, Tuple[Dict[str, str], ...]] = {
+    mood: tuple({"text": joke, "type": "joke"} for joke in jokes)
+    for mood, jokes in _MOOD_JOKES.items()
+}
+
 class EntertainmentAgent(BaseAgent):
     """Agent for entertainment content recommendations"""
     
+    __slots__ = (
+        "giphy_api_key", "tmdb_api_key", "giphy_base_url", "tmdb_base_url",
+        "_giphy_base_params", "_tmdb_base_params"
+    )
+    
     def __init__(self):
         super().__init__("entertainment")
         self.giphy_api_key = settings.giphy_api_key
         self.tmdb_api_key = settings.tmdb_api_key
         self.giphy_base_url = "https://api.giphy.com/v1/gifs"
         self.tmdb_base_url = "https://api.themoviedb.org/3"
+        
+        # Static query parameters; per-call values are merged on top
+        self._giphy_base_params = {
+            "api_key": self.giphy_api_key,
+            "rating": "g",  # Family-friendly content
+            "lang": "en"
+        }
+        self._tmdb_base_params = {
+            "api_key": self.tmdb_api_key,
+            "vote_average.gte": 6.0,  # Good ratings only
+            "language": "en-US",
+            "vote_count.gte": 100  # Ensure movies have enough votes
+        }
+    
+    @classmethod
+    async def _get_client(cls) -> httpx.AsyncClient:
+        """Get the process-wide HTTP client so Giphy/TMDb connections are kept alive between requests"""
+        global _SHARED_CLIENT
+        if _SHARED_CLIENT is None:
+            async with _CLIENT_LOCK:
+                if _SHARED_CLIENT is None:
+                    # HTTP/2 lets concurrent Giphy/TMDb requests multiplex over one TLS connection
+                    _SHARED_CLIENT = httpx.AsyncClient(
+                        http2=True,
+                        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+                        timeout=30.0
+                    )
+        return _SHARED_CLIENT
+    
+    async def _cached_fetch(self, cache: TTLCache, key: tuple, fetch: Callable[[], Awaitable[Optional[List[Dict]]]]) -> Optional[List[Dict]]:
+        """
+        Return the cached API page for key, fetching it on a miss
+        
+        Concurrent misses on the same key wait on one lock so only a single
+        network call is made. Failed fetches (None) are not cached.
+        """
+        if key in cache:
+            return cache[key]
+        
+        # Strong reference for the duration of this call keeps the shared lock alive
+        lock = _CACHE_LOCKS.get(key)
+        if lock is None:
+            lock = _CACHE_LOCKS[key] = asyncio.Lock()
+        async with lock:
+            if key in cache:
+                return cache[key]
+            
+            result = await fetch()
+            if result is not None:
+                cache[key] = result
+            return result
+    
+    async def _get_with_retry(self, client: httpx.AsyncClient, url: str, params: dict, max_tries: int = 3) -> httpx.Response:
+        """
+        GET with bounded exponential backoff on rate limits and transient upstream errors
+        
+        Honors the Retry-After header when present. Total sleep is capped at
+        _MAX_RETRY_WAIT so a throttled API never stalls the user request for long.
+        """
+        waited = 0.0
+        for attempt in range(max_tries):
+            response = await client.get(url, params=params)
+            if response.status_code not in _RETRY_STATUS_CODES or attempt == max_tries - 1:
+                return response
+            
+            try:
+                delay = float(response.headers.get("Retry-After", 2 ** attempt))
+            except ValueError:
+                delay = float(2 ** attempt)
+            
+            if waited + delay > _MAX_RETRY_WAIT:
+                return response
+            
+            self.log_activity(f"Got {response.status_code} from {url}, retrying in {delay:.1f}s", level="WARNING")
+            await asyncio.sleep(delay)
+            waited += delay
+        
+        return response
+    
+    @classmethod
+    async def aclose(cls):
+        """Close the shared HTTP client - must be called on app shutdown"""
+        global _SHARED_CLIENT
+        if _SHARED_CLIENT is not None:
+            await _SHARED_CLIENT.aclose()
+            _SHARED_CLIENT = None
     
     async def _extract_entertainment_preferences_from_llm(self, message: str) -> dict:
         """Extract specific entertainment preferences from user message using LLM"""
@@ -65,8 +264,7 @@ Use null for missing information."""
             self.log_activity(f"LLM raw response: {response}")
             
             # Parse JSON response
-            import json
-            preferences = json.loads(response)
+            preferences = orjson.loads(response)
             
             # Clean null values
             cleaned_preferences = {k: v for k, v in preferences.items() if v is not None and v != "null" and v != []}
@@ -74,7 +272,7 @@ Use null for missing information."""
             self.log_activity(f"Extracted preferences: {cleaned_preferences}")
             return cleaned_preferences
                 
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             self.log_activity(f"Failed to parse JSON: {e}, raw response: {response}")
             return {}
         except Exception as e:
@@ -101,52 +299,56 @@ Use null for missing information."""
             # Extract entertainment preferences using LLM
             preferences_data = await self._extract_entertainment_preferences_from_llm(user_message)
             
-            mood = parameters.get("mood", "neutral")
+            # Normalize the mood once; helpers below expect the lowercase form
+            mood = parameters.get("mood", "neutral").lower()
+            if mood not in _VALID_MOODS:
+                self.log_activity(f"Unknown mood '{mood}', using 'neutral'")
+                mood = "neutral"
             content_type = parameters.get("type", "mixed")
             intensity = parameters.get("intensity", "medium")
             
             self.log_activity(f"Finding entertainment for mood: {mood}, type: {content_type}, preferences: {preferences_data}")
             
-            content = {}
-            total_items = 0
+            # Collect the fetches for the requested content type, then run them
+            # concurrently - Giphy and TMDb calls are independent of each other
+            tasks = {}
+            jokes = None
             
             # Handle content type specifically
             if content_type == "jokes":
                 # For jokes, only show meme GIFs, no movies
-                gifs = await self._get_meme_gifs(mood, intensity)
-                content["gifs"] = gifs
-                total_items += len(gifs)
+                tasks["gifs"] = self._get_meme_gifs(mood, intensity)
                 
-                # Also get joke content
-                jokes = await self._get_mood_jokes(mood)
-                content["jokes"] = jokes
-                total_items += len(jokes)
+                # Also get joke content (static, no fetch needed)
+                jokes = self._get_mood_jokes(mood)
                 
             elif content_type == "movies":
                 # For movies, only movies
-                movies = await self._get_mood_movies(mood, intensity, preferences_data)
-                content["movies"] = movies
-                total_items += len(movies)
+                tasks["movies"] = self._get_mood_movies(mood, intensity, preferences_data)
                 
             elif content_type == "gifs":
                 # For GIFs, only GIFs
-                gifs = await self._get_mood_gifs(mood, intensity)
-                content["gifs"] = gifs
-                total_items += len(gifs)
+                tasks["gifs"] = self._get_mood_gifs(mood, intensity)
                 
             else:
                 # For mixed or default, get all types
-                gifs = await self._get_mood_gifs(mood, intensity)
-                content["gifs"] = gifs
-                total_items += len(gifs)
-                
-                movies = await self._get_mood_movies(mood, intensity, preferences_data)
-                content["movies"] = movies
-                total_items += len(movies)
-                
-                jokes = await self._get_mood_jokes(mood)
+                tasks["gifs"] = self._get_mood_gifs(mood, intensity)
+                tasks["movies"] = self._get_mood_movies(mood, intensity, preferences_data)
+                jokes = self._get_mood_jokes(mood)
+            
+            results = await asyncio.gather(*tasks.values(), return_exceptions=True)
+            
+            content = {}
+            for key, result in zip(tasks.keys(), results):
+                if isinstance(result, Exception):
+                    self.log_activity(f"Error fetching {key}: {result}", level="ERROR")
+                    result = []
+                content[key] = result
+            
+            if jokes is not None:
                 content["jokes"] = jokes
-                total_items += len(jokes)
+            
+            total_items = sum(len(items) for items in content.values())
             
             return_data = {
                 "content": content,
@@ -164,7 +366,7 @@ Use null for missing information."""
             return return_data
             
         except Exception as e:
-            self.log_activity(f"Error processing entertainment request: {e}", "ERROR")
+            self.log_activity(f"Error processing entertainment request: {e}", level="ERROR")
             return self._fallback_response(user_message)
     
     async def _get_mood_gifs(self, mood: str, intensity: str, limit: int = 5) -> List[Dict]:
@@ -174,62 +376,47 @@ Use null for missing information."""
             mood_terms = self._mood_to_gif_terms(mood, intensity)
             
             # Add randomness to search term selection
-            import random
-            search_term = random.choice(mood_terms) if mood_terms else "happy"
-            
-            # Add random offset to get different results each time
-            # Giphy search returns up to 50 results per page, we'll randomize offset
-            random_offset = random.randint(0, 45)  # Keep within reasonable range
-            
-            self.log_activity(f"Searching GIFs for mood '{mood}' with term '{search_term}' and offset {random_offset}")
-            
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.giphy_base_url}/search",
-                    params={
-                        "api_key": self.giphy_api_key,
-                        "q": search_term,
-                        "limit": limit * 2,  # Get more results to pick randomly from
-                        "offset": random_offset,
-                        "rating": "g",  # Family-friendly content
-                        "lang": "en"
+            search_term = _RNG.choice(mood_terms) if mood_terms else "happy"
+            
+            # Add random offset to get different results each time - variety comes
+            # from the term and offset, so only the GIFs we return are fetched
+            random_offset = _RNG.randint(0, 45)  # Keep within reasonable range
+            
+            # Round the offset down so repeated searches can share cached pages
+            random_offset -= random_offset % 10
+            
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("[%s] Searching GIFs mood=%s term=%s offset=%d", self.name, mood, search_term, random_offset)
+            
+            all_gifs = await self._cached_fetch(
+                _SHARED_GIF_CACHE,
+                ("giphy", search_term, random_offset, limit),
+                lambda: self._fetch_gifs(search_term, limit, random_offset)
+            )
+            
+            if all_gifs is not None:
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug("[%s] Giphy returned %d GIFs for term %s", self.name, len(all_gifs), search_term)
+                
+                gifs = [
+                    {
+                        "title": gif.get("title", "Fun GIF"),
+                        "url": gif["images"]["original"]["url"],
+                        "preview_url": gif["images"]["fixed_height_small"]["url"],
+                        "source": "giphy",
+                        "rating": gif.get("rating", "g"),
+                        "search_term": search_term,
+                        "mood": mood
                     }
-                )
+                    for gif in all_gifs[:limit]
+                ]
+                
+                return gifs
+            else:
+                return []
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    all_gifs = data.get("data", [])
-                    
-                    self.log_activity(f"Giphy returned {len(all_gifs)} GIFs for term '{search_term}'")
-                    
-                    # Randomly shuffle and select from results
-                    if all_gifs:
-                        random.shuffle(all_gifs)
-                        selected_gifs = all_gifs[:limit]
-                    else:
-                        selected_gifs = []
-                    
-                    gifs = []
-                    for gif in selected_gifs:
-                        gif_data = {
-                            "title": gif.get("title", "Fun GIF"),
-                            "url": gif["images"]["original"]["url"],
-                            "preview_url": gif["images"]["fixed_height_small"]["url"],
-                            "source": "giphy",
-                            "rating": gif.get("rating", "g"),
-                            "search_term": search_term,
-                            "mood": mood
-                        }
-                        gifs.append(gif_data)
-                        self.log_activity(f"Added GIF: {gif.get('title', 'Untitled')} for mood '{mood}'")
-                    
-                    return gifs
-                else:
-                    self.log_activity(f"Giphy API error: {response.status_code} - {response.text}", "ERROR")
-                    return []
-                    
         except Exception as e:
-            self.log_activity(f"Error fetching GIFs: {e}", "ERROR")
+            self.log_activity(f"Error fetching GIFs: {e}", level="ERROR")
             # Return empty list instead of failing completely
             return []
     
@@ -243,62 +430,46 @@ Use null for missing information."""
                 "internet meme", "viral meme", "funny gif", "humor"
             ]
             
-            import random
-            search_term = random.choice(meme_terms)
+            search_term = _RNG.choice(meme_terms)
             
             # Add random offset for variety
-            offset = random.randint(0, 50)
-            
-            self.log_activity(f"Searching meme GIFs with term '{search_term}' and offset {offset}")
-            
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.giphy_base_url}/search",
-                    params={
-                        "api_key": self.giphy_api_key,
-                        "q": search_term,
-                        "limit": limit * 2,  # Get more to filter better ones
-                        "offset": offset,
-                        "rating": "g",  # Keep it clean
-                        "lang": "en"
+            offset = _RNG.randint(0, 50)
+            
+            offset -= offset % 10  # Share cached pages between nearby offsets
+            
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("[%s] Searching meme GIFs term=%s offset=%d", self.name, search_term, offset)
+            
+            all_gifs = await self._cached_fetch(
+                _SHARED_GIF_CACHE,
+                ("giphy", search_term, offset, limit),
+                lambda: self._fetch_gifs(search_term, limit, offset)
+            )
+            
+            if all_gifs is not None:
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug("[%s] Giphy returned %d meme GIFs for term %s", self.name, len(all_gifs), search_term)
+                
+                gifs = [
+                    {
+                        "title": gif.get("title", "Funny Meme"),
+                        "url": gif["images"]["original"]["url"],
+                        "preview_url": gif["images"]["fixed_height_small"]["url"],
+                        "source": "giphy",
+                        "rating": gif.get("rating", "g"),
+                        "search_term": search_term,
+                        "mood": "funny",
+                        "type": "meme"
                     }
-                )
+                    for gif in all_gifs[:limit]
+                ]
+                
+                return gifs
+            else:
+                return []
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    all_gifs = data.get("data", [])
-                    
-                    self.log_activity(f"Giphy returned {len(all_gifs)} meme GIFs for term '{search_term}'")
-                    
-                    # Randomly shuffle and select best ones
-                    if all_gifs:
-                        random.shuffle(all_gifs)
-                        selected_gifs = all_gifs[:limit]
-                    else:
-                        selected_gifs = []
-                    
-                    gifs = []
-                    for gif in selected_gifs:
-                        gif_data = {
-                            "title": gif.get("title", "Funny Meme"),
-                            "url": gif["images"]["original"]["url"],
-                            "preview_url": gif["images"]["fixed_height_small"]["url"],
-                            "source": "giphy",
-                            "rating": gif.get("rating", "g"),
-                            "search_term": search_term,
-                            "mood": "funny",
-                            "type": "meme"
-                        }
-                        gifs.append(gif_data)
-                        self.log_activity(f"Added meme GIF: {gif.get('title', 'Untitled')} for jokes")
-                    
-                    return gifs
-                else:
-                    self.log_activity(f"Giphy API error for memes: {response.status_code} - {response.text}", "ERROR")
-                    return []
-                    
         except Exception as e:
-            self.log_activity(f"Error fetching meme GIFs: {e}", "ERROR")
+            self.log_activity(f"Error fetching meme GIFs: {e}", level="ERROR")
             return []
 
     async def _get_mood_movies(self, mood: str, intensity: str, preferences: dict = None, limit: int = 3) -> List[Dict]:
@@ -309,12 +480,9 @@ Use null for missing information."""
             
             # Build search parameters
             search_params = {
-                "api_key": self.tmdb_api_key,
+                **self._tmdb_base_params,
                 "sort_by": self._get_sort_preference(mood),
-                "vote_average.gte": 6.0,  # Good ratings only
-                "page": 1,
-                "language": "en-US",
-                "vote_count.gte": 100  # Ensure movies have enough votes
+                "page": 1
             }
             
             # Add genre if no specific preferences override it
@@ -327,138 +495,101 @@ Use null for missing information."""
             
             # Random page for variety (unless specific search)
             if not (preferences and any(preferences.get(k) for k in ["country", "language", "director", "actor"])):
-                import random
-                search_params["page"] = random.randint(1, 3)
+                search_params["page"] = _RNG.randint(1, 3)
             
-            self.log_activity(f"Searching movies with params: {search_params}")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("[%s] Searching movies genre=%s page=%s", self.name, search_params.get("with_genres"), search_params.get("page"))
             
-            async with httpx.AsyncClient() as client:
-                response = await client.get(f"{self.tmdb_base_url}/discover/movie", params=search_params)
+            cache_key = ("tmdb",) + tuple(sorted((k, v) for k, v in search_params.items() if k != "api_key"))
+            results = await self._cached_fetch(
+                _SHARED_MOVIE_CACHE,
+                cache_key,
+                lambda: self._fetch_movies(search_params)
+            )
+            
+            if results is not None:
+                if self.logger.isEnabledFor(logging.DEBUG):
+                    self.logger.debug("[%s] TMDb returned %d movies for genre %s", self.name, len(results), genre_id)
+                
+                movies = [
+                    {
+                        "title": movie.get("title"),
+                        # TMDb sends null overviews for some titles
+                        "overview": (movie.get("overview") or "")[:150] + "...",
+                        "rating": movie.get("vote_average"),
+                        "release_date": movie.get("release_date"),
+                        "poster_url": f"https://image.tmdb.org/t/p/w500{movie['poster_path']}" if movie.get("poster_path") else None,
+                        "genre_id": genre_id,
+                        "mood": mood,
+                        "source": "tmdb"
+                    }
+                    for movie in results[:limit]
+                ]
+                
+                return movies
+            else:
+                return []
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    movies = []
-                    
-                    self.log_activity(f"TMDb returned {len(data.get('results', []))} movies for genre {genre_id}")
-                    
-                    for movie in data.get("results", [])[:limit]:
-                        movie_data = {
-                            "title": movie.get("title"),
-                            "overview": movie.get("overview")[:150] + "...",
-                            "rating": movie.get("vote_average"),
-                            "release_date": movie.get("release_date"),
-                            "poster_url": f"https://image.tmdb.org/t/p/w500{movie.get('poster_path')}" if movie.get('poster_path') else None,
-                            "genre_id": genre_id,
-                            "mood": mood,
-                            "source": "tmdb"
-                        }
-                        movies.append(movie_data)
-                        self.log_activity(f"Added movie: {movie.get('title')} (rating: {movie.get('vote_average')})")
-                    
-                    return movies
-                else:
-                    self.log_activity(f"TMDb API error: {response.status_code} - {response.text}", "ERROR")
-                    return []
-                    
         except Exception as e:
-            self.log_activity(f"Error fetching movies: {e}", "ERROR")
+            self.log_activity(f"Error fetching movies: {e}", level="ERROR")
             return []
     
-    async def _get_mood_jokes(self, mood: str) -> List[Dict]:
-        """Generate mood-appropriate jokes or inspirational quotes"""
-        mood_jokes = {
-            "sad": [
-                "Kenapa ikan nggak pernah sedih? Soalnya dia selalu swimming in the good vibes! 🐠",
-                "Hari yang buruk bukan berarti hidup yang buruk. Besok adalah halaman baru! 📖"
-            ],
-            "happy": [
-                "Kenapa senyum itu gratis? Karena kebahagiaan nggak boleh dikenakan pajak! 😄",
-                "Hari ini adalah hari yang sempurna untuk bahagia! ✨"
-            ],
-            "angry": [
-                "Marah itu kayak memegang bara api untuk dilempar ke orang lain - yang kepanasan duluan kita sendiri 🔥",
-                "Take a deep breath... Sekarang hitung sampai 10... Masih marah? Hitung lagi! 😅"
-            ],
-            "stressed": [
-                "Kenapa komputer nggak pernah stress? Soalnya dia bisa di-restart! Kita juga bisa kok 💻",
-                "Stress itu kayak rocking chair - banyak gerakan tapi nggak kemana-mana 🪑"
-            ],
-            "default": [
-                "Hidup itu seperti kopi - bisa pahit, tapi bisa juga dibuat manis sesuai selera! ☕",
-                "Senyum adalah makeup terbaik yang bisa kamu pakai hari ini! 😊"
-            ]
-        }
+    async def _fetch_gifs(self, search_term: str, limit: int, offset: int) -> Optional[List[Dict]]:
+        """Fetch one page of Giphy search results, None on API error"""
+        client = await self._get_client()
+        async with _GIPHY_SEM:
+            response = await self._get_with_retry(
+                client,
+                f"{self.giphy_base_url}/search",
+                params={**self._giphy_base_params, "q": search_term, "limit": limit, "offset": offset}
+            )
         
-        jokes = mood_jokes.get(mood.lower(), mood_jokes["default"])
-        return [{"text": joke, "type": "joke"} for joke in jokes]
+        if response.status_code == 200:
+            data = orjson.loads(response.content)
+            return data.get("data", [])
+        
+        self.log_activity(f"Giphy API error: {response.status_code} - {response.text}", level="ERROR")
+        return None
+    
+    async def _fetch_movies(self, search_params: dict) -> Optional[List[Dict]]:
+        """Fetch one page of TMDb discover results, None on API error"""
+        client = await self._get_client()
+        async with _TMDB_SEM:
+            response = await self._get_with_retry(client, f"{self.tmdb_base_url}/discover/movie", params=search_params)
+        
+        if response.status_code == 200:
+            data = orjson.loads(response.content)
+            return data.get("results", [])
+        
+        self.log_activity(f"TMDb API error: {response.status_code} - {response.text}", level="ERROR")
+        return None
+    
+    def _get_mood_jokes(self, mood: str) -> List[Dict]:
+        """Generate mood-appropriate jokes or inspirational quotes"""
+        return list(_MOOD_JOKE_RESULTS.get(mood, _MOOD_JOKE_RESULTS["default"]))
     
-    def _mood_to_gif_terms(self, mood: str, intensity: str) -> List[str]:
+    def _mood_to_gif_terms(self, mood: str, intensity: str) -> Tuple[str, ...]:
         """Map mood to GIF search terms with variety"""
-        mood_terms = {
-            "happy": ["happy", "celebration", "joy", "dance", "smile", "cheerful", "excited", "yay"],
-            "sad": ["comfort", "hug", "cute animals", "support", "cheer up", "better days", "hope", "love"],
-            "angry": ["calm down", "chill", "relax", "meditation", "breathe", "peace", "zen", "cool down"],
-            "excited": ["excited", "party", "celebration", "wow", "amazing", "awesome", "yes", "victory"],
-            "tired": ["coffee", "sleep", "rest", "cozy", "nap", "energy", "tired", "yawn"],
-            "stressed": ["relax", "meditation", "calm", "peace", "stress relief", "breathe", "zen", "chill"],
-            "lonely": ["friendship", "love", "support", "care", "together", "friends", "hug", "connection"],
-            "confused": ["thinking", "question", "hmm", "wonder", "confused", "what", "mind blown", "puzzled"],
-            "grateful": ["thank you", "grateful", "appreciation", "love", "blessed", "thankful", "heart", "gratitude"],
-            "motivated": ["motivation", "success", "goal", "achievement", "you can do it", "strong", "power", "determination"],
-            "bored": ["fun", "entertainment", "interesting", "surprise", "random", "cool", "weird", "funny"],
-            "anxious": ["calm", "relax", "peace", "breathe", "anxiety relief", "comfort", "safe", "okay"],
-            "romantic": ["love", "romance", "heart", "cute couple", "sweet", "kiss", "adorable", "valentine"],
-            "nostalgic": ["memories", "nostalgia", "old times", "vintage", "classic", "throwback", "remember", "past"],
-            "energetic": ["energy", "active", "sports", "workout", "dynamic", "power", "strong", "go"],
-            "thoughtful": ["thinking", "deep", "philosophical", "wisdom", "contemplation", "reflection", "mind", "idea"],
-            "playful": ["play", "fun", "silly", "games", "laugh", "humor", "joke", "entertaining"],
-            "neutral": ["good vibes", "positive", "nice", "pleasant", "okay", "fine", "alright", "normal"]
-        }
+        # Intensity-adjusted variants are precomputed at import time
+        table = {"high": _MOOD_GIF_TERMS_HIGH, "low": _MOOD_GIF_TERMS_LOW}.get(intensity, _MOOD_GIF_TERMS)
         
         # Get terms for the mood, fallback to neutral if mood not found
-        terms = mood_terms.get(mood.lower(), mood_terms["neutral"])
-        
-        # Add intensity-based modifications
-        if intensity == "high":
-            # For high intensity, prefer more energetic terms
-            energetic_terms = ["very " + term for term in terms[:3]]
-            terms = energetic_terms + terms
-        elif intensity == "low":
-            # For low intensity, prefer calmer terms
-            calm_terms = ["gentle " + term for term in terms[:3]]
-            terms = calm_terms + terms
+        terms = table.get(mood, table["neutral"])
         
-        self.log_activity(f"Available GIF terms for mood '{mood}' (intensity: {intensity}): {terms}")
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("[%s] GIF terms for mood=%s intensity=%s: %s", self.name, mood, intensity, terms)
         return terms
     
     def _mood_to_movie_genre(self, mood: str) -> str:
         """Map mood to TMDb genre ID with some variety"""
-        # TMDb Genre IDs - now with multiple options per mood
-        mood_genres = {
-            "happy": ["35", "16", "10751"],     # Comedy, Animation, Family
-            "sad": ["18", "10749"],             # Drama, Romance
-            "excited": ["28", "12", "878"],     # Action, Adventure, Sci-Fi
-            "romantic": ["10749", "35"],        # Romance, Comedy
-            "scared": ["27", "53"],             # Horror, Thriller
-            "adventurous": ["12", "28", "14"],  # Adventure, Action, Fantasy
-            "thoughtful": ["18", "99", "36"],   # Drama, Documentary, History
-            "nostalgic": ["36", "10402", "18"], # History, Music, Drama
-            "energetic": ["28", "80", "9648"],  # Action, Crime, Mystery
-            "relaxed": ["35", "10770"],         # Comedy, TV Movie
-            "bored": ["28", "12", "878"],       # Action, Adventure, Sci-Fi
-            "anxious": ["35", "16"],            # Comedy, Animation
-            "angry": ["28", "80"],              # Action, Crime
-            "neutral": ["35", "18", "28"]       # Comedy, Drama, Action
-        }
-        
         # Get genres for the mood, fallback to happy if mood not found
-        genres = mood_genres.get(mood.lower(), mood_genres["happy"])
+        genres = _MOOD_MOVIE_GENRES.get(mood, _MOOD_MOVIE_GENRES["happy"])
         
         # Add some randomness to avoid same results
-        import random
-        selected_genre = random.choice(genres)
+        selected_genre = _RNG.choice(genres)
         
-        self.log_activity(f"Selected genre {selected_genre} for mood '{mood}' from options {genres}")
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("[%s] Selected genre %s for mood=%s from %s", self.name, selected_genre, mood, genres)
         return selected_genre
     
     def _get_sort_preference(self, mood: str) -> str:
@@ -478,8 +609,7 @@ Use null for missing information."""
         elif mood in ["happy", "relaxed"]:
             return "release_date.desc"
         else:
-            import random
-            return random.choice(sort_options)
+            return _RNG.choice(sort_options)
     
     async def _apply_movie_preferences(self, search_params: dict, preferences: dict) -> dict:
         """Apply extracted preferences to movie search parameters"""
@@ -1,7 +1,9 @@
 # Ambient Music URLs for Fallback
 # These are free streaming URLs that can be used when Spotify API is not available
 
-AMBIENT_MUSIC_URLS = {
+import types
+
+_AMBIENT_MUSIC_URLS = {
     "rain": {
         "url": "https://www.youtube.com/watch?v=yIQd2Ya0Ziw",
         "stream_url": "https://archive.org/download/RainSounds-8Hours/Rain%20Sounds%20-%208%20Hours.mp3",
@@ -39,6 +41,11 @@ AMBIENT_MUSIC_URLS = {
     }
 }
 
+# Read-only view shared by all importers - callers cannot mutate it at runtime
+AMBIENT_MUSIC_URLS = types.MappingProxyType({
+    name: types.MappingProxyType(track) for name, track in _AMBIENT_MUSIC_URLS.items()
+})
+
 # Note: These URLs are from Internet Archive which allows free streaming
 # YouTube URLs are provided as reference, but actual streaming should use archive.org links
 # Users can also use local files by placing them in backend/agents/music/ directory
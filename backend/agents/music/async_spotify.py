@@ -0,0 +1,160 @@
+# Async Spotify Web API client
+# Native asyncio client for the endpoints the music agent uses, with a cached
+# client-credentials token - no thread hops and no blocking calls on the event loop
+
+import asyncio
+import logging
+import time
+import httpx
+import orjson
+from typing import Dict, Any, List, Optional
+
+from ...core.rate_limit import TokenBucket
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+SPOTIFY_API_URL = "https://api.spotify.com/v1"
+SPOTIFY_TOKEN_URL = "https://accounts.spotify.com/api/token"
+SPOTIFY_MAX_PAGE_SIZE = 50  # Largest page /search returns - fewer, fuller calls
+SPOTIFY_TOKEN_REFRESH_LEAD = 240  # Background refresh this many seconds before the early expiry (~55 min into an hour token)
+
+# Cap in-flight Web API calls so fan-out bursts queue instead of tripping rate limits
+_SPOTIFY_SEM = asyncio.Semaphore(settings.spotify_max_concurrency)
+# ...and pace them to the sustained request rate, so retries are the exception
+_SPOTIFY_RATE = TokenBucket(
+    rate=settings.spotify_requests_per_minute / 60,
+    capacity=settings.spotify_requests_per_minute / 6
+)
+
+# Web API statuses worth retrying, and the total backoff budget per call (seconds)
+_RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+_MAX_RETRY_WAIT = 10.0
+
+
+class AsyncSpotifyClient:
+    """Client-credentials Spotify Web API client on a shared pooled httpx connection"""
+    
+    def __init__(self, client_id: str, client_secret: str):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self._http: Optional[httpx.AsyncClient] = None  # Shared pooled client, created lazily
+        self._token: Optional[str] = None
+        self._token_expires_at = 0.0
+        self._token_lock = asyncio.Lock()  # One refresh at a time, concurrent callers wait for it
+        self._token_task: Optional[asyncio.Task] = None
+    
+    async def _get_client(self) -> httpx.AsyncClient:
+        """Get the shared HTTP client so Spotify connections are kept alive between requests"""
+        if self._http is None:
+            # HTTP/2 lets concurrent Web API calls multiplex over one TLS connection
+            self._http = httpx.AsyncClient(
+                base_url=SPOTIFY_API_URL,
+                http2=True,
+                # Pool sized above the fan-out so bursts reuse warm connections instead of re-handshaking
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=32, keepalive_expiry=60),
+                timeout=15.0
+            )
+        return self._http
+    
+    async def get_access_token(self) -> str:
+        """Get a client-credentials bearer token, reusing it until shortly before expiry"""
+        if self._token and time.monotonic() < self._token_expires_at:
+            return self._token
+        
+        async with self._token_lock:
+            # Another request may have refreshed it while we waited
+            if self._token and time.monotonic() < self._token_expires_at:
+                return self._token
+            return await self._fetch_token()
+    
+    async def _fetch_token(self) -> str:
+        """POST the client-credentials grant - callers hold the token lock"""
+        client = await self._get_client()
+        response = await client.post(
+            SPOTIFY_TOKEN_URL,
+            data={"grant_type": "client_credentials"},
+            auth=(self.client_id, self.client_secret)
+        )
+        response.raise_for_status()
+        data = orjson.loads(response.content)
+        
+        self._token = data["access_token"]
+        # Refresh a minute early so in-flight calls never carry an expired token
+        self._token_expires_at = time.monotonic() + data.get("expires_in", 3600) - 60
+        return self._token
+    
+    def start_token_refresh(self):
+        """Keep the bearer token fresh in the background so user requests never wait on a refresh"""
+        if self._token_task is None:
+            self._token_task = asyncio.create_task(self._token_refresh_loop())
+    
+    async def _token_refresh_loop(self):
+        """Fetch the token up front, then refresh it ahead of expiry, retrying shortly after a failed refresh"""
+        while True:
+            try:
+                async with self._token_lock:
+                    # A request may have fetched one first (e.g. the startup prewarm) - don't fetch twice
+                    if time.monotonic() >= self._token_expires_at - SPOTIFY_TOKEN_REFRESH_LEAD:
+                        await self._fetch_token()
+                delay = self._token_expires_at - time.monotonic() - SPOTIFY_TOKEN_REFRESH_LEAD
+            except Exception as e:
+                logger.warning(f"Background Spotify token refresh failed: {e}")
+                delay = 30
+            await asyncio.sleep(max(delay, 1))
+    
+    async def get(self, path: str, params: Optional[Dict[str, Any]] = None, max_tries: int = 3) -> Dict:
+        """
+        GET a Web API endpoint with the cached bearer token
+        
+        Retries rate limits and transient upstream errors with short exponential
+        backoff (or Retry-After), within _MAX_RETRY_WAIT seconds in total.
+        """
+        client = await self._get_client()
+        waited = 0.0
+        for attempt in range(max_tries):
+            token = await self.get_access_token()
+            async with _SPOTIFY_RATE, _SPOTIFY_SEM:
+                response = await client.get(path, params=params, headers={"Authorization": f"Bearer {token}"})
+            if response.status_code not in _RETRY_STATUS_CODES or attempt == max_tries - 1:
+                break
+            
+            try:
+                delay = float(response.headers.get("Retry-After", 0.2 * 2 ** attempt))
+            except ValueError:
+                delay = 0.2 * 2 ** attempt
+            
+            if waited + delay > _MAX_RETRY_WAIT:
+                break
+            
+            logger.warning(f"Got {response.status_code} from Spotify {path}, retrying in {delay:.1f}s")
+            if response.status_code == 429:
+                # Rate limited - hold every caller on the bucket, not just this one
+                _SPOTIFY_RATE.pause(delay)
+            else:
+                await asyncio.sleep(delay)
+            waited += delay
+        
+        response.raise_for_status()
+        return orjson.loads(response.content)
+    
+    async def search(self, q: str, type: str = "track", limit: int = SPOTIFY_MAX_PAGE_SIZE) -> Dict:
+        """Search the catalog - returns the raw paging object keyed by type"""
+        return await self.get("/search", {"q": q, "type": type, "limit": limit})
+    
+    async def artist_top_tracks(self, artist_id: str, country: str = "ID") -> List[Dict]:
+        """Get an artist's top tracks in a market"""
+        return (await self.get(f"/artists/{artist_id}/top-tracks", {"market": country}))["tracks"]
+    
+    async def artist_related_artists(self, artist_id: str) -> List[Dict]:
+        """Get artists similar to the given one"""
+        return (await self.get(f"/artists/{artist_id}/related-artists"))["artists"]
+    
+    async def aclose(self):
+        """Stop the token refresh and close the shared HTTP client"""
+        if self._token_task is not None:
+            self._token_task.cancel()
+            self._token_task = None
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
@@ -2,39 +2,242 @@
 Music Agent - Specialist for mood-based music recommendations using Spotify API
 """
 
-import spotipy
-from spotipy.oauth2 import SpotifyClientCredentials
-from typing import Dict, Any, List
-import sys
-import os
+import asyncio
+import contextlib
+import functools
+import re
+import types
+from pydantic import BaseModel, ValidationError
+from typing import AsyncIterator, Awaitable, Callable, Dict, Any, List, Optional, Sequence
 
-# Add project root to path for imports
-project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-sys.path.append(project_root)
-
-from backend.core.memory_agent import MemoryAgent
-from backend.agents.music.ambient_urls import AMBIENT_MUSIC_URLS
+from ..core.memory_agent import MemoryAgent
+from .music.ambient_urls import AMBIENT_MUSIC_URLS
+from .music.async_spotify import AsyncSpotifyClient
 from config.settings import settings
 
+# Artist names that get matched incorrectly, as one precompiled case-insensitive scan:
+# "netral"/"ntrl" is an Indonesian band, "neutral" avoids literal mood matches
+_UNWANTED_ARTIST_RE = re.compile(r"netral|ntrl|neutral", re.IGNORECASE)
+
+# Known popular artists for fallback extraction, compiled into one alternation -
+# longest names first so "sheila on 7" wins over any shorter overlapping name
+_KNOWN_ARTISTS = (
+    "pamungkas", "noah", "sheila on 7", "tulus", "hindia", "raisa", "afgan",
+    "feast", "ungu", "d'masiv", "peterpan", "nidji", "gigi", "slank",
+    "coldplay", "taylor swift", "ed sheeran", "bruno mars", "maroon 5"
+)
+_KNOWN_ARTIST_RE = re.compile(
+    r"\b(" + "|".join(re.escape(artist) for artist in sorted(_KNOWN_ARTISTS, key=len, reverse=True)) + r")\b",
+    re.IGNORECASE
+)
+
+# Static mood lookup tables, built once at import time
+
+# Indonesian mood -> English search word
+_MOOD_EN = types.MappingProxyType({
+    "sedih": "sad",
+    "senang": "happy", 
+    "bahagia": "happy",
+    "gembira": "happy",
+    "marah": "angry",
+    "tenang": "calm",
+    "rileks": "relaxed",
+    "energik": "energetic",
+    "romantis": "romantic",
+    "nostalgia": "nostalgic",
+    "fokus": "focused",
+    "ceria": "cheerful",
+    "melankolis": "melancholic"
+})
+
+# Mood -> Spotify genre
+_MOOD_GENRE = types.MappingProxyType({
+    # Indonesian moods
+    "sedih": "indie",
+    "senang": "pop", 
+    "bahagia": "pop",
+    "gembira": "dance",
+    "ceria": "pop",
+    "marah": "rock",
+    "tenang": "ambient",
+    "rileks": "chill",
+    "energik": "electronic",
+    "romantis": "soul",
+    "nostalgia": "classic rock",
+    "fokus": "instrumental",
+    "melankolis": "alternative",
+    
+    # English moods
+    "happy": "pop",
+    "sad": "indie",
+    "energetic": "electronic", 
+    "calm": "ambient",
+    "romantic": "soul",
+    "angry": "rock",
+    "nostalgic": "classic rock",
+    "focused": "instrumental",
+    "relaxed": "chill",
+    "excited": "dance",
+    "cheerful": "pop",
+    "melancholic": "alternative"
+})
+
+# Only a message with "lagu X" / "denger X" / "kaya X"... or a capitalized word
+# past the first can name an unknown artist; anything else skips the LLM.
+# The lookahead keeps chained phrases ("pengen denger X") from hiding X.
+_ARTIST_HINT_RE = re.compile(r"\b(?:lagu|lagunya|denger|dengerin|pengen|kaya|kayak|seperti|mirip)\s+(?=([\w']+))", re.IGNORECASE)
+_CAPITALIZED_WORD_RE = re.compile(r"\s[A-Z]")
+
+# Words after a hint phrase that are not artist names - moods, genres and filler
+_NON_ARTIST_WORDS = frozenset({
+    *_MOOD_EN, *_MOOD_EN.values(), *_MOOD_GENRE,
+    *(word for genre in _MOOD_GENRE.values() for word in genre.split()),
+    "lagu", "lagunya", "denger", "dengerin", "pengen", "kaya", "kayak", "seperti", "mirip",
+    "yang", "yg", "dong", "aja", "buat", "untuk", "lagi", "apa", "musik", "enak",
+    "santai", "galau", "baru", "populer", "rekomendasi", "gitu", "the", "a", "something"
+})
+
+class _ArtistReply(BaseModel):
+    """Expected JSON from the artist-extraction prompt"""
+    artist: Optional[str] = None
+
+# Common moods whose default recommendations are cached at startup
+_PREWARM_MOODS = (
+    "happy", "sad", "calm", "relaxed", "energetic",
+    "romantic", "angry", "nostalgic", "focused", "excited"
+)
+
+# Target audio features per mood, before intensity adjustment
+_BASE_FEATURES = types.MappingProxyType({
+    "happy": {"valence": 0.8, "energy": 0.7, "danceability": 0.7},
+    "sad": {"valence": 0.2, "energy": 0.3, "danceability": 0.3},
+    "energetic": {"valence": 0.7, "energy": 0.9, "danceability": 0.8},
+    "calm": {"valence": 0.5, "energy": 0.2, "danceability": 0.3},
+    "romantic": {"valence": 0.6, "energy": 0.4, "danceability": 0.5},
+    "angry": {"valence": 0.3, "energy": 0.8, "danceability": 0.5},
+    "nostalgic": {"valence": 0.4, "energy": 0.5, "danceability": 0.4},
+    "focused": {"valence": 0.5, "energy": 0.6, "danceability": 0.2},
+    "relaxed": {"valence": 0.6, "energy": 0.3, "danceability": 0.4}
+})
+
+def _pick_cover(images: Optional[List[Dict]]) -> Optional[str]:
+    """Prefer a medium-size album cover, fallback to first available"""
+    images = images or ()
+    return next(
+        (img["url"] for img in images if 200 <= (img.get("height") or 0) <= 400),
+        images[0]["url"] if images else None
+    )
+
+_ARTIST_JOIN = ", ".join
+
+def _track_to_rec(track: Dict) -> Dict[str, Any]:
+    """Format a Spotify track object as a recommendation"""
+    album = track["album"]
+    artists = track["artists"]
+    return {
+        "title": track["name"],
+        # Most tracks have a single artist - use the name as-is, no join needed
+        "artist": artists[0]["name"] if len(artists) == 1 else _ARTIST_JOIN(artist["name"] for artist in artists),
+        "album": album["name"],
+        "url": track["external_urls"]["spotify"],
+        "preview_url": track.get("preview_url"),
+        "cover_url": _pick_cover(album.get("images")),
+        "release_date": album.get("release_date", ""),
+        "popularity": track.get("popularity", 0),
+        "duration_ms": track.get("duration_ms", 0),
+        "explicit": track.get("explicit", False)
+    }
+
+# Mood lookups are pure and hit on every request - memoize per raw mood string
+@functools.lru_cache(maxsize=256)
+def _translate_mood_to_english(mood: str) -> str:
+    return _MOOD_EN.get(mood.casefold(), mood)
+
+@functools.lru_cache(maxsize=256)
+def _mood_to_genre(mood: str) -> str:
+    return _MOOD_GENRE.get(mood.casefold(), "pop")
+
+# Intensity shifts energy and danceability, clamped to [0, 1]
+_INTENSITY_SHIFT = {"high": 0.2, "medium": 0.0, "low": -0.2}
+
+# Every (mood, intensity) feature set, precomputed so lookups do no arithmetic
+_AUDIO_FEATURES = types.MappingProxyType({
+    (mood, intensity): types.MappingProxyType({
+        **features,
+        "energy": min(1.0, max(0.0, features["energy"] + shift)),
+        "danceability": min(1.0, max(0.0, features["danceability"] + shift))
+    })
+    for mood, features in _BASE_FEATURES.items()
+    for intensity, shift in _INTENSITY_SHIFT.items()
+})
+
+# Static reply used when Spotify is unavailable. Callers get a shallow copy since
+# the manager annotates the top-level dict
+_FALLBACK_RESPONSE = types.MappingProxyType({
+    "recommendations": (
+        {
+            "title": "Relaxing Piano Music",
+            "artist": "Peaceful Piano",
+            "album": "Calm & Peaceful",
+            "url": "#",
+            "preview_url": None,
+            "cover_url": "https://via.placeholder.com/300x300/1DB954/FFFFFF?text=🎵",
+            "release_date": "2023",
+            "popularity": 75,
+            "duration_ms": 180000,
+            "explicit": False,
+            "note": "Koneksi Spotify tidak tersedia, ini adalah rekomendasi umum"
+        },
+        {
+            "title": "Chill Vibes",
+            "artist": "Lo-Fi Beats",
+            "album": "Study Music",
+            "url": "#",
+            "preview_url": None,
+            "cover_url": "https://via.placeholder.com/300x300/4ECDC4/FFFFFF?text=🎶",
+            "release_date": "2023",
+            "popularity": 68,
+            "duration_ms": 210000,
+            "explicit": False,
+            "note": "Koneksi Spotify tidak tersedia, ini adalah rekomendasi umum"
+        }
+    ),
+    "mood_analysis": "general",
+    "genre": "various",
+    "total_found": 2,
+    "error": "Spotify API not available"
+})
+
 class MusicAgent(MemoryAgent):
     """Agent for music recommendations based on mood"""
     
     def __init__(self):
         super().__init__("music")
+        self._inflight: Dict[str, asyncio.Future] = {}  # Searches and LLM calls currently running, keyed by cache key
         self.setup_spotify()
     
     def setup_spotify(self):
-        """Initialize Spotify client"""
-        try:
-            client_credentials_manager = SpotifyClientCredentials(
-                client_id=settings.spotify_client_id,
-                client_secret=settings.spotify_client_secret
-            )
-            self.spotify = spotipy.Spotify(client_credentials_manager=client_credentials_manager)
+        """Check Spotify credentials - the client's HTTP connection is opened lazily"""
+        self.spotify = AsyncSpotifyClient(settings.spotify_client_id, settings.spotify_client_secret)
+        self.spotify_enabled = bool(settings.spotify_client_id and settings.spotify_client_secret)
+        if self.spotify_enabled:
             self.log_activity("Spotify client initialized successfully")
-        except Exception as e:
-            self.log_activity(f"Failed to initialize Spotify client: {e}", "ERROR")
-            self.spotify = None
+        else:
+            self.log_activity("Spotify credentials missing, using fallback recommendations", level="ERROR")
+    
+    def start_token_refresh(self):
+        """Keep the bearer token fresh in the background so user requests never wait on a refresh"""
+        if self.spotify_enabled:
+            self.spotify.start_token_refresh()
+    
+    async def _async_search(self, term: str) -> List[Dict]:
+        """Search Spotify tracks without blocking the event loop"""
+        results = await self.spotify.search(term, type="track")
+        return results["tracks"]["items"]
+    
+    async def aclose(self):
+        """Stop the token refresh and close the Spotify client (called on app shutdown)"""
+        await self.spotify.aclose()
     
     async def process(self, user_message: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -52,7 +255,7 @@ class MusicAgent(MemoryAgent):
             }
         """
         try:
-            if not self.spotify:
+            if not self.spotify_enabled:
                 return self._fallback_response(user_message)
             
             # Get session ID for personalization
@@ -69,11 +272,29 @@ class MusicAgent(MemoryAgent):
                 return await self._get_mood_based_recommendations(user_message, parameters, session_id)
                 
         except Exception as e:
-            self.log_activity(f"Error processing music request: {e}", "ERROR")
+            self.log_activity(f"Error processing music request: {e}", level="ERROR")
             return self._fallback_response(user_message)
 
     async def _extract_artist_from_message(self, message: str) -> str:
         """Extract artist/band name from user message using LLM"""
+        # Cheap checks first: a known name needs no LLM, and neither does a message with no artist-shaped phrase
+        match = _KNOWN_ARTIST_RE.search(message)
+        if match:
+            return match.group(1).lower()
+        if not self._may_name_artist(message):
+            return None
+        
+        # Repeated or resent messages reuse the earlier answer instead of another Groq round trip
+        cache_key = self.get_cache_key({"artist_message": " ".join(message.lower().split())[:200]})
+        cached = self.get_cached_response(cache_key)
+        if cached:
+            return cached.get("artist")
+        
+        # Identical messages arriving together share one LLM call
+        return await self._single_flight(cache_key, lambda: self._llm_extract_artist(message, cache_key))
+    
+    async def _llm_extract_artist(self, message: str, cache_key: str) -> Optional[str]:
+        """Ask the LLM for the artist in the message and cache the answer"""
         try:
             system_prompt = """
             Ekstrak nama artis/band dari pesan user. Jika tidak ada nama artis yang disebutkan, return null.
@@ -101,7 +322,7 @@ class MusicAgent(MemoryAgent):
             ]
             
             # Import groq_client
-            from backend.core.groq_client import groq_client
+            from ..core.groq_client import groq_client
             
             response = await groq_client.chat_completion(
                 messages=messages,
@@ -110,107 +331,60 @@ class MusicAgent(MemoryAgent):
                 response_format={"type": "json_object"}
             )
             
-            import json
-            result = json.loads(response)
-            artist = result.get("artist")
+            # Parse and validate in one pass; a reply that doesn't fit the schema means no usable artist
+            try:
+                artist = _ArtistReply.model_validate_json(response).artist
+            except ValidationError:
+                self.log_activity(f"LLM artist reply did not match the expected schema: {response[:100]}", level="WARNING")
+                return None
             
             # Return None if artist is null or empty
             if artist and artist.lower() not in ["null", "none", ""]:
                 self.log_activity(f"LLM extracted artist: '{artist}' from message: '{message[:50]}...'")
-                return artist.strip()
+                artist = artist.strip()
             else:
-                return None
+                artist = None
+            
+            self.cache_response(cache_key, {"artist": artist}, ttl_hours=1)
+            return artist
                 
         except Exception as e:
-            self.log_activity(f"Error in LLM artist extraction: {e}", "ERROR")
+            self.log_activity(f"Error in LLM artist extraction: {e}", level="ERROR")
             # Fallback to simple keyword matching
             return self._fallback_artist_extraction(message)
     
+    def _may_name_artist(self, message: str) -> bool:
+        """Whether the message could mention an artist the keyword list doesn't know"""
+        if _CAPITALIZED_WORD_RE.search(message):
+            return True
+        return any(word.lower() not in _NON_ARTIST_WORDS for word in _ARTIST_HINT_RE.findall(message))
+    
     def _fallback_artist_extraction(self, message: str) -> str:
         """Fallback artist extraction using simple keyword matching"""
-        # Known popular artists for fallback
-        known_artists = [
-            "pamungkas", "noah", "sheila on 7", "tulus", "hindia", "raisa", "afgan",
-            "feast", "ungu", "d'masiv", "peterpan", "nidji", "gigi", "slank",
-            "coldplay", "taylor swift", "ed sheeran", "bruno mars", "maroon 5"
-        ]
-        
-        clean_message = message.lower()
-        for artist in known_artists:
-            if artist in clean_message:
-                return artist
-        
-        return None
+        match = _KNOWN_ARTIST_RE.search(message)
+        return match.group(1).lower() if match else None
 
     async def _get_artist_based_recommendations(self, artist_name: str, user_message: str, parameters: Dict[str, Any], session_id: str) -> Dict[str, Any]:
         """Get recommendations based on specific artist"""
         try:
             self.log_activity(f"Searching for artist-based recommendations: {artist_name}")
             
-            # Search for the artist
-            results = self.spotify.search(q=f"artist:{artist_name}", type="artist", limit=1)
+            # Collect the streamed stages into one response
+            artist_info = None
+            recommendations: List[Dict] = []
+            async with contextlib.aclosing(self.stream_artist_recommendations(artist_name)) as stages:
+                async for stage in stages:
+                    if stage["type"] == "artist":
+                        artist_info = stage["artist_info"]
+                    recommendations.extend(stage["recommendations"])
             
-            if not results["artists"]["items"]:
+            if artist_info is None:
                 # Fallback to general search
                 self.log_activity(f"Artist '{artist_name}' not found, falling back to general search")
                 return await self._get_mood_based_recommendations(user_message, parameters, session_id)
             
-            artist = results["artists"]["items"][0]
-            artist_id = artist["id"]
-            
-            # Get artist's top tracks
-            top_tracks = self.spotify.artist_top_tracks(artist_id, country='ID')["tracks"]
-            
-            # Get related artists for variety (with error handling)
-            related_tracks = []
-            try:
-                related_artists = self.spotify.artist_related_artists(artist_id)["artists"][:3]
-                
-                # Get some tracks from related artists
-                for related_artist in related_artists:
-                    try:
-                        related_top = self.spotify.artist_top_tracks(related_artist["id"], country='ID')["tracks"][:2]
-                        related_tracks.extend(related_top)
-                    except Exception as e:
-                        self.log_activity(f"Error getting tracks for related artist {related_artist['name']}: {e}")
-                        continue
-                        
-            except Exception as e:
-                self.log_activity(f"Error getting related artists for {artist['name']}: {e}")
-                # Continue without related tracks
-            
-            # Combine tracks (prioritize main artist)
-            all_tracks = top_tracks[:8] + related_tracks[:2]
-            
-            recommendations = []
-            for track in all_tracks:
-                # Get album cover image
-                album_images = track["album"].get("images", [])
-                cover_url = None
-                if album_images:
-                    for img in album_images:
-                        if img.get("height") and 200 <= img["height"] <= 400:
-                            cover_url = img["url"]
-                            break
-                    if not cover_url:
-                        cover_url = album_images[0]["url"]
-                
-                recommendation = {
-                    "title": track["name"],
-                    "artist": ", ".join([artist["name"] for artist in track["artists"]]),
-                    "album": track["album"]["name"],
-                    "url": track["external_urls"]["spotify"],
-                    "preview_url": track.get("preview_url"),
-                    "cover_url": cover_url,
-                    "release_date": track["album"].get("release_date", ""),
-                    "popularity": track.get("popularity", 0),
-                    "duration_ms": track.get("duration_ms", 0),
-                    "explicit": track.get("explicit", False)
-                }
-                recommendations.append(recommendation)
-            
             # Get artist genres for context
-            artist_genres = artist.get("genres", [])
+            artist_genres = artist_info["genres"]
             main_genre = artist_genres[0] if artist_genres else "pop"
             
             mood = parameters.get("mood", "happy")
@@ -221,13 +395,8 @@ class MusicAgent(MemoryAgent):
                 "genre": main_genre,
                 "total_found": len(recommendations),
                 "personalized": True,
-                "artist_requested": artist["name"],
-                "artist_info": {
-                    "name": artist["name"],
-                    "genres": artist_genres,
-                    "popularity": artist.get("popularity", 0),
-                    "followers": artist.get("followers", {}).get("total", 0)
-                },
+                "artist_requested": artist_info["name"],
+                "artist_info": artist_info,
                 "search_parameters": {
                     "artist": artist_name,
                     "mood": mood,
@@ -239,18 +408,90 @@ class MusicAgent(MemoryAgent):
             return response
             
         except Exception as e:
-            self.log_activity(f"Error in artist-based search for '{artist_name}': {e}", "ERROR")
+            self.log_activity(f"Error in artist-based search for '{artist_name}': {e}", level="ERROR")
             # Fallback to mood-based recommendations
             return await self._get_mood_based_recommendations(user_message, parameters, session_id)
+    
+    async def stream_artist_recommendations(self, artist_name: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield artist-based recommendations in stages as Spotify answers
+        
+        First {"type": "artist", "artist_info", "recommendations"} with the artist's
+        own top tracks, then {"type": "related", "recommendations"} as each
+        related artist's tracks arrive. Yields nothing if the artist isn't found.
+        """
+        # Search for the artist
+        results = await self.spotify.search(f"artist:{artist_name}", type="artist", limit=1)
+        if not results["artists"]["items"]:
+            return
+        
+        artist = results["artists"]["items"][0]
+        artist_id = artist["id"]
+        
+        # Artist's own top tracks go out first (prioritize main artist). A popular artist
+        # with a full top-10 fills every slot alone, so the related fan-out is skipped
+        top_tracks = await self.spotify.artist_top_tracks(artist_id, country="ID")
+        fills_alone = len(top_tracks) >= 10 and artist.get("popularity", 0) >= 60
+        top_tracks = top_tracks[:10] if fills_alone else top_tracks[:8]
+        yield {
+            "type": "artist",
+            "artist_info": {
+                "name": artist["name"],
+                "genres": artist.get("genres", []),
+                "popularity": artist.get("popularity", 0),
+                "followers": artist.get("followers", {}).get("total", 0)
+            },
+            "recommendations": [_track_to_rec(track) for track in top_tracks]
+        }
+        
+        if fills_alone:
+            return
+        
+        # Related artists for variety (with error handling) - one artist's tracks
+        # cover the 2 slots left, so fetch just that one
+        try:
+            related_artists = (await self.spotify.artist_related_artists(artist_id))[:1]
+        except Exception as e:
+            self.log_activity(f"Error getting related artists for {artist['name']}: {e}")
+            return
+        
+        # Independent calls - fetch together and pass on whichever lands first, up to 2 tracks.
+        # A related artist's top track can be a collaboration already sent, so dedupe by ID
+        seen = {track["id"] for track in top_tracks}
+        remaining = 2
+        fetches = {
+            asyncio.ensure_future(self.spotify.artist_top_tracks(related_artist["id"], country="ID")): related_artist
+            for related_artist in related_artists
+        }
+        pending = set(fetches)
+        try:
+            while pending and remaining:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                batch = []
+                for fetch in done:
+                    if fetch.exception() is not None:
+                        self.log_activity(f"Error getting tracks for related artist {fetches[fetch]['name']}: {fetch.exception()}")
+                        continue
+                    for track in fetch.result()[:2]:
+                        if remaining and track["id"] not in seen:
+                            seen.add(track["id"])
+                            batch.append(track)
+                            remaining -= 1
+                if batch:
+                    yield {"type": "related", "recommendations": [_track_to_rec(track) for track in batch]}
+        finally:
+            for fetch in pending:
+                fetch.cancel()
 
     async def _get_mood_based_recommendations(self, user_message: str, parameters: Dict[str, Any], session_id: str) -> Dict[str, Any]:
         """Get general mood-based recommendations (original logic)"""
         try:
-            # Extract mood and genre from parameters
-            mood = parameters.get("mood", "neutral")
+            # Extract mood and genre from parameters - casefolded once so every
+            # lookup (and its lru_cache) sees a single spelling per mood
+            mood = parameters.get("mood", "neutral").casefold()
             
-            # Get user preferences from memory
-            user_preferences = self.get_user_preferences(session_id)
+            # Get user preferences from memory (SQLite read, kept off the event loop)
+            user_preferences = await asyncio.to_thread(self.get_user_preferences, session_id)
             preferred_genre = user_preferences.get("preferred_genre", {}).get("value")
             
             # Use user's preferred genre if available, otherwise map from mood
@@ -258,269 +499,199 @@ class MusicAgent(MemoryAgent):
             intensity = parameters.get("intensity", "medium")
             
             # Create cache key for this request
-            cache_params = {
-                "mood": mood,
-                "genre": genre,
-                "intensity": intensity,
-                "session_preferences": bool(user_preferences)
-            }
-            cache_key = self.get_cache_key(cache_params)
+            cache_key = self._mood_cache_key(mood, genre, intensity, bool(user_preferences))
             
             # Try to get cached response first
             cached_response = self.get_cached_response(cache_key)
             if cached_response:
                 self.log_activity(f"Returning cached music recommendations for {mood}")
                 cached_response["from_cache"] = True
+                cached_response["mood_analysis"] = mood
                 return cached_response
             
-            self.log_activity(f"Searching music for mood: {mood}, genre: {genre}, preferences: {bool(user_preferences)}")
-            
-            # Get personalized context for better recommendations
-            context = self.get_personalized_context(session_id, mood)
-            
-            # Search for tracks based on mood and genre
-            tracks = await self._search_tracks_by_mood(mood, genre, intensity, context)
-            
-            recommendations = []
-            for track in tracks:
-                # Get album cover image (prefer medium size)
-                album_images = track["album"].get("images", [])
-                cover_url = None
-                if album_images:
-                    # Try to get medium size image, fallback to first available
-                    for img in album_images:
-                        if img.get("height") and 200 <= img["height"] <= 400:
-                            cover_url = img["url"]
-                            break
-                    if not cover_url:
-                        cover_url = album_images[0]["url"]
-                
-                recommendation = {
-                    "title": track["name"],
-                    "artist": ", ".join([artist["name"] for artist in track["artists"]]),
-                    "album": track["album"]["name"],
-                    "url": track["external_urls"]["spotify"],
-                    "preview_url": track.get("preview_url"),
-                    "cover_url": cover_url,
-                    "release_date": track["album"].get("release_date", ""),
-                    "popularity": track.get("popularity", 0),
-                    "duration_ms": track.get("duration_ms", 0),
-                    "explicit": track.get("explicit", False)
-                }
-                recommendations.append(recommendation)
-            
-            response = {
-                "recommendations": recommendations,
-                "mood_analysis": mood,
-                "genre": genre,
-                "total_found": len(recommendations),
-                "personalized": bool(user_preferences),
-                "search_parameters": {
-                    "mood": mood,
-                    "genre": genre,
-                    "intensity": intensity
-                },
-                "from_cache": False
-            }
-            
-            # Cache the response for 2 hours
-            self.cache_response(cache_key, response, ttl_hours=2)
-            
-            return response
+            # Same key already being searched - share that result instead of hitting Spotify again
+            response = await self._single_flight(
+                cache_key,
+                lambda: self._search_mood_response(cache_key, mood, genre, intensity, user_preferences, session_id)
+            )
+            if response is None:
+                return self._fallback_response(user_message)
+            return dict(response)
             
         except Exception as e:
-            self.log_activity(f"Error in mood-based search: {e}", "ERROR")
+            self.log_activity(f"Error in mood-based search: {e}", level="ERROR")
             return self._fallback_response(user_message)
     
+    async def _search_mood_response(self, cache_key: str, mood: str, genre: str, intensity: str,
+                                    user_preferences: Dict, session_id: str) -> Dict[str, Any]:
+        """Run the Spotify search for a mood and cache the response"""
+        self.log_activity(f"Searching music for mood: {mood}, genre: {genre}, preferences: {bool(user_preferences)}")
+        
+        # Get personalized context for better recommendations
+        context = await asyncio.to_thread(self.get_personalized_context, session_id, mood)
+        
+        # Search for tracks based on mood and genre (already formatted as recommendations)
+        recommendations = await self._search_tracks_by_mood(mood, genre, intensity, context)
+        
+        response = self._build_mood_response(recommendations, mood, genre, intensity, bool(user_preferences))
+        
+        # Cache the response - TTL follows how often this key is requested, 2 hours until known
+        self.cache_response(cache_key, response, ttl_hours=self.adaptive_ttl_hours(cache_key, default_hours=2))
+        return response
+    
+    async def _single_flight(self, key: str, work: Callable[[], Awaitable[Any]], default: Any = None) -> Any:
+        """
+        Run work() once per key at a time - concurrent callers with the same key share its result
+        
+        Waiters get `default` if the leading call fails or is cancelled; the leader
+        sees its own exception.
+        """
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.log_activity(f"Joining in-flight request {key}")
+            return await asyncio.shield(inflight)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await work()
+            future.set_result(result)
+            return result
+        finally:
+            if not future.done():
+                future.set_result(default)
+            self._inflight.pop(key, None)
+    
+    def _mood_cache_key(self, mood: str, genre: str, intensity: str, personalized: bool) -> str:
+        """Cache key for mood-based results - canonical English mood and lowercase genre, so e.g. "sedih" and "sad" share one entry"""
+        return self.get_cache_key({
+            "mood": self._translate_mood_to_english(mood).casefold(),
+            "genre": genre.casefold(),
+            "intensity": intensity,
+            "session_preferences": personalized
+        })
+    
+    def _build_mood_response(self, recommendations: List[Dict], mood: str, genre: str, intensity: str, personalized: bool) -> Dict[str, Any]:
+        """Assemble the mood-based recommendation payload"""
+        return {
+            "recommendations": recommendations,
+            "mood_analysis": mood,
+            "genre": genre,
+            "total_found": len(recommendations),
+            "personalized": personalized,
+            "search_parameters": {
+                "mood": mood,
+                "genre": genre,
+                "intensity": intensity
+            },
+            "from_cache": False
+        }
+    
+    async def prewarm_cache(self, ttl_hours: int = 12):
+        """Populate the cache for common moods so first requests skip the Spotify round trips"""
+        if not self.spotify_enabled:
+            return
+        
+        warmed = 0
+        for mood in _PREWARM_MOODS:
+            try:
+                genre = self._mood_to_genre(mood)
+                cache_key = self._mood_cache_key(mood, genre, "medium", False)
+                if self.get_cached_response(cache_key, record_lookup=False):
+                    continue
+                
+                recommendations = await self._search_tracks_by_mood(mood, genre, "medium")
+                if recommendations:
+                    response = self._build_mood_response(recommendations, mood, genre, "medium", False)
+                    self.cache_response(cache_key, response, ttl_hours=ttl_hours)
+                    warmed += 1
+            except Exception as e:
+                self.log_activity(f"Cache prewarm failed for mood '{mood}': {e}", level="WARNING")
+        
+        self.log_activity(f"Prewarmed music cache for {warmed} moods")
+    
     async def _search_tracks_by_mood(self, mood: str, genre: str, intensity: str, context: str = "", limit: int = 10) -> List[Dict]:
-        """Search for tracks based on mood parameters"""
+        """Search for tracks based on mood parameters, returning formatted recommendations"""
         try:
             # Map Indonesian mood to English search terms
             mood_english = self._translate_mood_to_english(mood)
             
-            # Create search queries based on mood and genre
-            search_terms = [
+            # The genre filter leads (one full page usually suffices); the mood phrasings are only
+            # searched, together, when it comes back short. No OR-compound query - Spotify's
+            # search API no longer documents OR, so it isn't relied on
+            search_terms = (
                 f"genre:{genre}",  # Use genre prefix for better results
-                f"{genre} {intensity}",
                 f"{mood_english} {genre}",
-                f"{mood_english} music",
-                genre
-            ]
-            
-            all_tracks = []
-            
-            # Try multiple search terms to get better results
-            for term in search_terms:
-                try:
-                    self.log_activity(f"Searching with term: '{term}'")
-                    results = self.spotify.search(
-                        q=term,
-                        type="track",
-                        limit=20
-                    )
-                    
-                    tracks = results["tracks"]["items"]
-                    
-                    # Filter tracks based on popularity and avoid specific Indonesian bands
-                    filtered_tracks = [
-                        track for track in tracks 
-                        if (track.get("popularity", 0) > 15 and  # Lower threshold for more results
-                            not self._is_unwanted_artist(track))
-                    ]
-                    
-                    all_tracks.extend(filtered_tracks)
-                    
-                    if len(all_tracks) >= limit * 2:  # Get more for better filtering
-                        break
-                        
-                except Exception as search_error:
-                    self.log_activity(f"Search term '{term}' failed: {search_error}", "WARNING")
-                    continue
+                f"{mood_english} music"
+            )
             
-            # Remove duplicates based on track ID
-            unique_tracks = []
-            seen_ids = set()
+            tracks: List[Dict] = []
             
-            for track in all_tracks:
-                if track["id"] not in seen_ids:
-                    unique_tracks.append(track)
-                    seen_ids.add(track["id"])
+            # Candidates arrive already filtered and deduped; closing the generator
+            # once we have enough means the next search is never sent
+            async with contextlib.aclosing(self._mood_track_candidates(search_terms)) as candidates:
+                async for track in candidates:
+                    tracks.append(track)
+                    if len(tracks) >= limit:
+                        break
             
-            # Return top results
-            return unique_tracks[:limit]
+            return [_track_to_rec(track) for track in tracks]
             
         except Exception as e:
-            self.log_activity(f"Error searching tracks: {e}", "ERROR")
+            self.log_activity(f"Error searching tracks: {e}", level="ERROR")
             return []
     
+    async def _mood_track_candidates(self, search_terms: Sequence[str]) -> AsyncIterator[Dict]:
+        """Yield usable tracks one by one - the primary term first, then the backup terms fetched together"""
+        seen = set()
+        # Backups are only requested if the consumer is still reading after the primary page
+        for batch in (search_terms[:1], search_terms[1:]):
+            if not batch:
+                continue
+            pages = await asyncio.gather(*(self._async_search(term) for term in batch), return_exceptions=True)
+            
+            for term, tracks in zip(batch, pages):
+                if isinstance(tracks, Exception):
+                    self.log_activity(f"Search term '{term}' failed: {tracks}", level="WARNING")
+                    continue
+                
+                for track in tracks:
+                    track_id = track["id"]
+                    # Skip duplicates, low popularity and specific Indonesian bands
+                    if (track_id in seen or
+                            track.get("popularity", 0) <= 15 or  # Lower threshold for more results
+                            self._is_unwanted_artist(track)):
+                        continue
+                    seen.add(track_id)
+                    yield track
+    
     def _translate_mood_to_english(self, mood: str) -> str:
         """Translate Indonesian mood to English for better Spotify search"""
-        mood_translation = {
-            "sedih": "sad",
-            "senang": "happy", 
-            "bahagia": "happy",
-            "gembira": "happy",
-            "marah": "angry",
-            "tenang": "calm",
-            "rileks": "relaxed",
-            "energik": "energetic",
-            "romantis": "romantic",
-            "nostalgia": "nostalgic",
-            "fokus": "focused",
-            "ceria": "cheerful",
-            "melankolis": "melancholic"
-        }
-        return mood_translation.get(mood.lower(), mood)
+        return _translate_mood_to_english(mood)
     
     def _is_unwanted_artist(self, track: Dict) -> bool:
         """Filter out artists that might be incorrectly matched"""
-        unwanted_artists = [
-            "netral", "ntrl",  # Indonesian band that gets matched incorrectly
-            "neutral",  # Avoid literal "neutral" matches
-        ]
-        
-        for artist in track.get("artists", []):
-            artist_name = artist.get("name", "").lower()
-            if any(unwanted in artist_name for unwanted in unwanted_artists):
-                return True
-        return False
+        # One scan over all names; "|" can't be part of a match, so names never run together
+        return _UNWANTED_ARTIST_RE.search("|".join(artist.get("name", "") for artist in track.get("artists", ()))) is not None
     
     def _mood_to_genre(self, mood: str) -> str:
         """Map mood to music genre"""
-        mood_genre_map = {
-            # Indonesian moods
-            "sedih": "indie",
-            "senang": "pop", 
-            "bahagia": "pop",
-            "gembira": "dance",
-            "ceria": "pop",
-            "marah": "rock",
-            "tenang": "ambient",
-            "rileks": "chill",
-            "energik": "electronic",
-            "romantis": "soul",
-            "nostalgia": "classic rock",
-            "fokus": "instrumental",
-            "melankolis": "alternative",
-            
-            # English moods
-            "happy": "pop",
-            "sad": "indie",
-            "energetic": "electronic", 
-            "calm": "ambient",
-            "romantic": "soul",
-            "angry": "rock",
-            "nostalgic": "classic rock",
-            "focused": "instrumental",
-            "relaxed": "chill",
-            "excited": "dance",
-            "cheerful": "pop",
-            "melancholic": "alternative"
-        }
-        return mood_genre_map.get(mood.lower(), "pop")
+        return _mood_to_genre(mood)
     
     def _mood_to_audio_features(self, mood: str, intensity: str) -> Dict[str, float]:
         """Map mood and intensity to Spotify audio features"""
-        base_features = {
-            "happy": {"valence": 0.8, "energy": 0.7, "danceability": 0.7},
-            "sad": {"valence": 0.2, "energy": 0.3, "danceability": 0.3},
-            "energetic": {"valence": 0.7, "energy": 0.9, "danceability": 0.8},
-            "calm": {"valence": 0.5, "energy": 0.2, "danceability": 0.3},
-            "romantic": {"valence": 0.6, "energy": 0.4, "danceability": 0.5},
-            "angry": {"valence": 0.3, "energy": 0.8, "danceability": 0.5},
-            "nostalgic": {"valence": 0.4, "energy": 0.5, "danceability": 0.4},
-            "focused": {"valence": 0.5, "energy": 0.6, "danceability": 0.2},
-            "relaxed": {"valence": 0.6, "energy": 0.3, "danceability": 0.4}
-        }
-        
-        features = base_features.get(mood.lower(), base_features["happy"])
+        mood = mood.casefold()
+        if mood not in _BASE_FEATURES:
+            mood = "happy"
+        if intensity not in _INTENSITY_SHIFT:
+            intensity = "medium"
         
-        # Adjust for intensity
-        if intensity == "high":
-            features["energy"] = min(1.0, features["energy"] + 0.2)
-            features["danceability"] = min(1.0, features["danceability"] + 0.2)
-        elif intensity == "low":
-            features["energy"] = max(0.0, features["energy"] - 0.2)
-            features["danceability"] = max(0.0, features["danceability"] - 0.2)
-        
-        return features
+        # Copy so callers never touch the shared table
+        return dict(_AUDIO_FEATURES[(mood, intensity)])
     
     def _fallback_response(self, user_message: str) -> Dict[str, Any]:
         """Fallback response when Spotify API is not available"""
-        return {
-            "recommendations": [
-                {
-                    "title": "Relaxing Piano Music",
-                    "artist": "Peaceful Piano",
-                    "album": "Calm & Peaceful",
-                    "url": "#",
-                    "preview_url": None,
-                    "cover_url": "https://via.placeholder.com/300x300/1DB954/FFFFFF?text=🎵",
-                    "release_date": "2023",
-                    "popularity": 75,
-                    "duration_ms": 180000,
-                    "explicit": False,
-                    "note": "Koneksi Spotify tidak tersedia, ini adalah rekomendasi umum"
-                },
-                {
-                    "title": "Chill Vibes",
-                    "artist": "Lo-Fi Beats",
-                    "album": "Study Music",
-                    "url": "#",
-                    "preview_url": None,
-                    "cover_url": "https://via.placeholder.com/300x300/4ECDC4/FFFFFF?text=🎶",
-                    "release_date": "2023",
-                    "popularity": 68,
-                    "duration_ms": 210000,
-                    "explicit": False,
-                    "note": "Koneksi Spotify tidak tersedia, ini adalah rekomendasi umum"
-                }
-            ],
-            "mood_analysis": "general",
-            "genre": "various",
-            "total_found": 2,
-            "error": "Spotify API not available"
-        }
+        return dict(_FALLBACK_RESPONSE)
     
     def _extract_preferences(self, session_id: str, user_request: str, response: Dict):
         """Extract and store user music preferences from successful interactions"""
@@ -553,7 +724,7 @@ class MusicAgent(MemoryAgent):
                 self.remember(session_id, "mood_genre_map", associations, importance=7)
         
         except Exception as e:
-            self.log_activity(f"Failed to extract music preferences: {e}", "ERROR")
+            self.log_activity(f"Failed to extract music preferences: {e}", level="ERROR")
     
     def learn_user_feedback(self, session_id: str, track_id: str, feedback: str, 
                            track_data: Dict = None):
@@ -586,4 +757,4 @@ class MusicAgent(MemoryAgent):
                                     True, importance=6)
         
         except Exception as e:
-            self.log_activity(f"Failed to learn from user feedback: {e}", "ERROR")
+            self.log_activity(f"Failed to learn from user feedback: {e}", level="ERROR")
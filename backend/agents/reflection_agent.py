@@ -2,24 +2,222 @@
 Reflection Agent - Specialist for introspective conversations using Groq LLM
 """
 
-from typing import Dict, Any, List
-import sys
-import os
+import asyncio
+import hashlib
+import types
+from collections import deque
+from itertools import islice
+import orjson
+from cachetools import TTLCache
+from typing import AsyncIterator, Dict, Any, List, Optional, Set
 
-# Add project root to path for imports
-project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-sys.path.append(project_root)
+from ..core.base_agent import BaseAgent
+from ..core.groq_client import groq_client
+from ..core.semantic_cache import SemanticCache
+from config.settings import settings
+
+# Per-session state is kept for a day after the last turn, for at most this many sessions
+_SESSION_TTL_SECONDS = 86400
+_MAX_SESSIONS = 10_000
+# Hard cap on turns kept per session - summaries normally trim well before this
+_MAX_HISTORY_TURNS = 30
+# Sessions summarized together per worker batch - also the cap on concurrent summary calls
+_SUMMARY_BATCH_SIZE = 10
+# Opening messages shorter than this ("hi", "halo", "ok") get a canned reply instead of a Groq call
+_SHORT_MESSAGE_CHARS = 8
+
+# Static reflection content, built once at import time
+
+# Conversation persona and style - kept free of per-turn values so every request
+# starts with the same prefix, which the provider can reuse from its prompt cache
+_CONVERSATION_SYSTEM_PROMPT = """
+Kamu adalah teman dekat yang bisa diajak curhat. Respond dengan natural kayak ngobrol di WhatsApp.
+
+KARAKTERISTIK:
+- Ngobrol santai, pake bahasa Indonesia casual
+- Care dan supportive tapi ga formal
+- Fokus dengerin dan validasi perasaan mereka
+- Tanya follow-up yang natural buat bikin nyaman cerita
+- JANGAN langsung kasih rekomendasi musik/hiburan kecuali user eksplisit minta
+
+GAYA BICARA:
+- Kayak chat sama teman deket
+- Pake kata "iya", "emang", "banget", "sih", "dong", etc
+- Ga perlu panjang-panjang, 1-2 kalimat cukup
+- Kalau udah ada context sebelumnya, sambung dari situ
+- Tunjukkin empati yang genuine
+- FOKUS pada percakapan, bukan rekomendasi
+
+PENTING: HANYA suggest musik/hiburan kalau user bilang "minta rekomendasi" atau "cariin musik" atau hal serupa. Sebaliknya, tetap fokus jadi pendengar yang baik.
+
+Respond natural dalam 1-2 kalimat pendek yang caring.
+"""
+
+# Summary request for older turns - only the conversation is filled in per call
+_SUMMARY_PROMPT_TEMPLATE = """
+Summarize this conversation between a user and their supportive friend.
+Focus on:
+- Main emotional themes and topics discussed
+- Key events or situations mentioned
+- User's feelings and emotional journey
+- Important context for future conversation
+
+Keep it concise but meaningful in Indonesian, casual tone.
+
+Conversation to summarize:
+{conversation}
+"""
+
+# Mood-based fallback replies when the LLM call fails
+_FALLBACK_RESPONSES = types.MappingProxyType({
+    "sad": "iya, kayaknya berat banget ya yang kamu rasain. mau cerita lebih lanjut?",
+    "angry": "kesel banget ya? boleh cerita kenapa sampe segitunya?",
+    "confused": "kayaknya lagi bingung banget nih. gimana ceritanya?",
+    "anxious": "sepertinya lagi khawatir ya? ada apa emang?",
+    "default": "kayaknya ada yang pengen diceritain nih. aku dengerin kok"
+})
+
+# Casual questions to encourage sharing, per mood
+_QUESTIONS_BY_MOOD = types.MappingProxyType({
+    "sad": (
+        "kenapa itu sakit hatinya? boleh diceritain?",
+        "ada yang bikin kecewa ya? gimana ceritanya?",
+        "masih ada hal yang bikin seneng ga hari ini?"
+    ),
+    "anxious": (
+        "lagi khawatir apa sih? sharing dong",
+        "kayaknya overthinking nih, bener ga?",
+        "kalau misal terjadi hal terburuk, terus gimana menurutmu?"
+    ),
+    "angry": (
+        "kesel banget ya? kenapa emangnya?",
+        "yang bikin sebel itu apa sih?",
+        "pengen marah-marah atau pengen cerita dulu?"
+    ),
+    "confused": (
+        "bingung ya? emang lagi mikirin apa?",
+        "kayaknya dilema nih, gimana ceritanya?",
+        "kata hati kamu gimana? ikutin aja dulu"
+    ),
+    "grateful": (
+        "siapa yang paling berperan bikin kamu bersyukur?",
+        "gimana caranya berbagi kebersyukuran ini sama orang lain?",
+        "apa yang bisa kamu lakukan buat pertahanin perasaan positif ini?"
+    ),
+    "lonely": (
+        "lagi berasa sendirian ya? gimana ceritanya?",
+        "kapan terakhir kali chat sama temen? mau coba reach out ga?",
+        "kadang sendirian itu berat ya, tapi kamu ga sendirian kok"
+    ),
+    "default": (
+        "gimana perasaan kamu tentang hal ini?",
+        "mau cerita lebih lanjut ga?",
+        "ada yang pengen kamu sharing?"
+    )
+})
+
+# Self-reflection activities
+_SUGGESTIONS = types.MappingProxyType({
+    "journaling": {
+        "title": "Nulis di jurnal",
+        "description": "Tulis aja 3 hal yang kamu rasain hari ini, bebas mau gimana",
+        "time_needed": "10-15 menit",
+        "benefits": "Bikin pikiran jadi lebih clear"
+    },
+    "meditation": {
+        "title": "Duduk tenang bentar",
+        "description": "Coba duduk diam dan perhatiin napas kamu aja",
+        "time_needed": "5-10 menit",
+        "benefits": "Bikin hati tenang dan pikiran jernih"
+    },
+    "letter_writing": {
+        "title": "Nulis surat buat diri sendiri",
+        "description": "Bayangin kamu lagi ngasih semangat ke diri sendiri",
+        "time_needed": "15-20 menit",
+        "benefits": "Jadi lebih sayang sama diri sendiri"
+    },
+    "gratitude": {
+        "title": "Inget hal-hal baik",
+        "description": "Tulis 5 hal yang bikin kamu seneng hari ini, sekecil apapun",
+        "time_needed": "5 menit",
+        "benefits": "Mood jadi lebih positif"
+    },
+    "body_scan": {
+        "title": "Cek perasaan di badan",
+        "description": "Perhatiin gimana rasanya di kepala, dada, sampe kaki",
+        "time_needed": "10-15 menit",
+        "benefits": "Nyambungin pikiran sama perasaan"
+    },
+    "music": {
+        "title": "Dengerin musik",
+        "description": "Pilih lagu yang sesuai sama mood kamu sekarang",
+        "time_needed": "10-30 menit",
+        "benefits": "Bantu ekspresiin perasaan"
+    },
+    "walk": {
+        "title": "Jalan-jalan bentar",
+        "description": "Keluar rumah atau jalan di dalam ruangan aja",
+        "time_needed": "10-20 menit",
+        "benefits": "Bikin pikiran fresh"
+    }
+})
+
+# Which activities to suggest for each mood
+_MOOD_SUGGESTIONS = types.MappingProxyType({
+    "sad": ("journaling", "music", "letter_writing"),
+    "anxious": ("meditation", "walk", "body_scan"),
+    "angry": ("walk", "body_scan", "music"),
+    "confused": ("journaling", "walk", "letter_writing"),
+    "grateful": ("gratitude", "journaling", "music"),
+    "lonely": ("music", "letter_writing", "gratitude")
+})
+_DEFAULT_SUGGESTIONS = ("journaling", "music", "walk")
+
+# Prompts to continue the conversation, general and mood-specific
+_FOLLOW_UP_PROMPTS = (
+    "cerita lebih lanjut yuk...",
+    "apa yang paling berat dari situasi ini?",
+    "biasanya kamu gimana sih kalau ngadepin perasaan kaya gini?",
+    "ada orang yang bisa diajak ngobrol ga tentang hal ini?",
+    "kamu berharap gimana setelah cerita ini?"
+)
+
+_MOOD_FOLLOW_UP_PROMPTS = types.MappingProxyType({
+    "sad": (
+        "apa yang biasanya bikin kamu merasa lebih baik?",
+        "kapan terakhir kali kamu seneng banget? karena apa?"
+    ),
+    "anxious": (
+        "apa skenario terbaik yang mungkin terjadi?",
+        "gimana cara kamu tenang-tenang kalau lagi cemas?"
+    ),
+    "angry": (
+        "kamu maunya gimana sih sama orang atau situasi yang bikin kesel?",
+        "gimana cara kamu ngungkapin marah tanpa nyakitin orang?"
+    )
+})
 
-from backend.core.base_agent import BaseAgent
-from backend.core.groq_client import groq_client
 
 class ReflectionAgent(BaseAgent):
     """Agent for deep reflection and introspective conversations"""
     
     def __init__(self):
         super().__init__("reflection")
-        self.conversation_history = {}  # Store conversation context per user
-        self.conversation_summaries = {}  # Store conversation summaries per user
+        # Bounded, so idle sessions are evicted instead of piling up for the life of the process
+        self.conversation_history = TTLCache(maxsize=_MAX_SESSIONS, ttl=_SESSION_TTL_SECONDS)  # Store conversation context per user
+        self.conversation_summaries = TTLCache(maxsize=_MAX_SESSIONS, ttl=_SESSION_TTL_SECONDS)  # Store conversation summaries per user
+        # Sessions waiting for a summary, drained in batches by a single background worker
+        self._summary_queue: asyncio.Queue = asyncio.Queue()
+        self._queued_summaries: Set[str] = set()
+        self._summary_worker: Optional[asyncio.Task] = None
+        # Exact prompt -> reply, so retries and duplicate submits skip the Groq round trip
+        self._response_cache = TTLCache(maxsize=1024, ttl=600)
+        self._inflight: Dict[str, asyncio.Future] = {}  # Exact-cache key -> reply of the Groq call in flight
+        # Paraphrase -> reply for opening messages, e.g. "aku sedih" vs "aku lagi sedih banget"
+        self._semantic_cache = SemanticCache(
+            settings.reflection_semantic_cache_model,
+            threshold=settings.reflection_semantic_cache_threshold
+        ) if settings.reflection_semantic_cache_enabled else None
     
     async def process(self, user_message: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -34,10 +232,11 @@ class ReflectionAgent(BaseAgent):
             }
         """
         try:
-            mood = parameters.get("mood", "contemplative")
+            # Normalized once here - the mood tables and caches below are all keyed lowercase
+            mood = (parameters.get("mood") or "contemplative").lower()
             session_id = parameters.get("session_id", "default")
             
-            self.log_activity(f"Reflection conversation: mood: {mood}, session: {session_id}")
+            self.log_activity("Reflection conversation: mood: %s, session: %s", mood, session_id)
             
             # Get conversation history for this session
             conversation_context = self.conversation_history.get(session_id, [])
@@ -62,57 +261,108 @@ class ReflectionAgent(BaseAgent):
             }
             
         except Exception as e:
-            self.log_activity(f"Error processing reflection request: {e}", "ERROR")
+            self.log_activity("Error processing reflection request: %s", e, level="ERROR")
             return self._fallback_response(user_message)
     
-    async def _generate_conversational_response(self, user_message: str, mood: str, conversation_context: List, session_id: str) -> str:
-        """Generate natural conversational response with context awareness"""
+    async def stream_conversational_response(self, user_message: str, parameters: Dict[str, Any]) -> AsyncIterator[str]:
+        """
+        Stream the conversational reply as text chunks while Groq generates it
         
-        # Build conversation history for context
-        context_text = ""
+        A cached reply is yielded whole. The finished reply is cached and added to the
+        session history just as in process(); if Groq fails before any text arrives
+        the mood fallback is yielded instead.
+        """
+        mood = (parameters.get("mood") or "contemplative").lower()
+        session_id = parameters.get("session_id", "default")
+        conversation_context = self.conversation_history.get(session_id, [])
+        
+        messages = self._build_conversation_messages(user_message, mood, conversation_context, session_id)
+        cache_key = hashlib.sha256(orjson.dumps(messages)).hexdigest()
+        reply = self._short_message_reply(user_message, mood, conversation_context, session_id) or self._response_cache.get(cache_key)
+        if reply is not None:
+            yield reply
+        else:
+            chunks = []
+            try:
+                async for chunk in groq_client.stream_chat_completion(messages=messages, temperature=0.8, max_tokens=200):
+                    chunks.append(chunk)
+                    yield chunk
+                reply = "".join(chunks).strip()
+                self._response_cache[cache_key] = reply
+            except Exception as e:
+                self.log_activity("Error streaming conversational response: %s", e, level="ERROR")
+                if not chunks:
+                    chunks.append(_FALLBACK_RESPONSES.get(mood, _FALLBACK_RESPONSES["default"]))
+                    yield chunks[0]
+                reply = "".join(chunks).strip()
+        
+        await self._update_conversation_history(session_id, user_message, reply)
+    
+    def _short_message_reply(self, user_message: str, mood: str, conversation_context: List, session_id: str) -> Optional[str]:
+        """Canned mood reply for a very short opening message, or None if Groq should answer"""
+        # Mid-conversation, a short "iya" or "ok" answers the last reply, so only openers qualify
+        if len(user_message.strip()) >= _SHORT_MESSAGE_CHARS or conversation_context or self.conversation_summaries.get(session_id):
+            return None
+        return _FALLBACK_RESPONSES.get(mood, _FALLBACK_RESPONSES["default"])
+    
+    def _build_conversation_messages(self, user_message: str, mood: str, conversation_context: List, session_id: str) -> List[Dict[str, str]]:
+        """Build the chat messages for a conversational reply - persona, mood, then summary, recent turns and the message"""
+        # Build conversation history for context, joined once rather than concatenated piece by piece
+        context_parts = []
         session_summary = self.conversation_summaries.get(session_id, "")
         
         if session_summary:
-            context_text += f"Previous conversation summary: {session_summary}\n\n"
+            context_parts.append(f"Previous conversation summary: {session_summary}\n")
         
         if conversation_context:
-            context_text += "Recent conversation:\n"
-            for turn in conversation_context[-5:]:  # Last 5 turns for context (increased from 3)
-                context_text += f"User: {turn['user']}\nYou: {turn['assistant']}\n"
-            context_text += "\nCurrent message:\n"
-        
-        system_prompt = f"""
-        Kamu adalah teman dekat yang bisa diajak curhat. Respond dengan natural kayak ngobrol di WhatsApp.
+            context_parts.append("Recent conversation:")
+            context_parts.extend(
+                f"User: {turn['user']}\nYou: {turn['assistant']}"
+                for turn in islice(conversation_context, max(0, len(conversation_context) - 5), None)  # Last 5 turns for context (increased from 3)
+            )
+            context_parts.append("\nCurrent message:")
         
-        KARAKTERISTIK:
-        - Ngobrol santai, pake bahasa Indonesia casual
-        - Care dan supportive tapi ga formal
-        - Fokus dengerin dan validasi perasaan mereka
-        - Tanya follow-up yang natural buat bikin nyaman cerita
-        - JANGAN langsung kasih rekomendasi musik/hiburan kecuali user eksplisit minta
+        context_text = "\n".join(context_parts) + "\n" if context_parts else ""
         
-        GAYA BICARA:
-        - Kayak chat sama teman deket
-        - Pake kata "iya", "emang", "banget", "sih", "dong", etc
-        - Ga perlu panjang-panjang, 1-2 kalimat cukup
-        - Kalau udah ada context sebelumnya, sambung dari situ
-        - Tunjukkin empati yang genuine
-        - FOKUS pada percakapan, bukan rekomendasi
+        # Static instructions first and per-turn details after, so every call shares the same prompt prefix
+        return [
+            {"role": "system", "content": _CONVERSATION_SYSTEM_PROMPT},
+            {"role": "system", "content": f"SITUASI SEKARANG:\n- Mood: {mood}\n- User butuh tempat curhat dan didengar"},
+            {"role": "user", "content": f"{context_text}User: {user_message}"}
+        ]
+    
+    async def _generate_conversational_response(self, user_message: str, mood: str, conversation_context: List, session_id: str) -> str:
+        """Generate natural conversational response with context awareness"""
+        short_reply = self._short_message_reply(user_message, mood, conversation_context, session_id)
+        if short_reply is not None:
+            return short_reply
         
-        PENTING: HANYA suggest musik/hiburan kalau user bilang "minta rekomendasi" atau "cariin musik" atau hal serupa. Sebaliknya, tetap fokus jadi pendengar yang baik.
+        messages = self._build_conversation_messages(user_message, mood, conversation_context, session_id)
         
-        SITUASI SEKARANG:
-        - Mood: {mood}
-        - User butuh tempat curhat dan didengar
+        # Key on the whole prompt - same message, mood, summary and recent turns
+        cache_key = hashlib.sha256(orjson.dumps(messages)).hexdigest()
+        cached = self._response_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
-        Respond natural dalam 1-2 kalimat pendek yang caring.
-        """
+        # Only context-free turns are matched by meaning - later replies depend on the conversation
+        embedding = None
+        use_semantic = self._semantic_cache is not None and not conversation_context and not self.conversation_summaries.get(session_id)
+        if use_semantic:
+            cached, embedding = await self._semantic_cache.lookup(user_message, mood)
+            if cached is not None:
+                return cached
         
-        messages = [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": f"{context_text}User: {user_message}"}
-        ]
+        inflight = self._inflight.get(cache_key)
+        if inflight is not None:
+            # The same prompt is already on its way to Groq - share that reply
+            self.log_activity("Joining in-flight reply %.12s", cache_key)
+            return await asyncio.shield(inflight)
         
+        # Fallback responses based on mood
+        fallback = _FALLBACK_RESPONSES.get(mood, _FALLBACK_RESPONSES["default"])
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
         try:
             response = await groq_client.chat_completion(
                 messages=messages,
@@ -120,60 +370,88 @@ class ReflectionAgent(BaseAgent):
                 max_tokens=200
             )
             
-            return response.strip()
+            reply = response.strip()
+            self._response_cache[cache_key] = reply
+            if use_semantic:
+                self._semantic_cache.add(embedding, mood, reply)
+            future.set_result(reply)
+            return reply
             
         except Exception as e:
-            self.log_activity(f"Error generating conversational response: {e}", "ERROR")
-            # Fallback responses based on mood
-            fallback_responses = {
-                "sad": "iya, kayaknya berat banget ya yang kamu rasain. mau cerita lebih lanjut?",
-                "angry": "kesel banget ya? boleh cerita kenapa sampe segitunya?",
-                "confused": "kayaknya lagi bingung banget nih. gimana ceritanya?",
-                "anxious": "sepertinya lagi khawatir ya? ada apa emang?",
-                "default": "kayaknya ada yang pengen diceritain nih. aku dengerin kok"
-            }
-            return fallback_responses.get(mood.lower(), fallback_responses["default"])
+            self.log_activity("Error generating conversational response: %s", e, level="ERROR")
+            return fallback
+        finally:
+            # Waiters get the fallback too if the call failed or was cancelled
+            if not future.done():
+                future.set_result(fallback)
+            self._inflight.pop(cache_key, None)
     
     async def _update_conversation_history(self, session_id: str, user_message: str, assistant_response: str):
         """Update conversation history for context with summarization"""
-        if session_id not in self.conversation_history:
-            self.conversation_history[session_id] = []
-        
-        self.conversation_history[session_id].append({
+        # Bounded deque - O(1) append, and the oldest turns fall off on their own if summaries fall behind
+        history = self.conversation_history.get(session_id)
+        if history is None:
+            history = deque(maxlen=_MAX_HISTORY_TURNS)
+        history.append({
             "user": user_message,
             "assistant": assistant_response
         })
+        # Re-set on every turn so the TTL runs from the last message, not the first
+        self.conversation_history[session_id] = history
         
-        # If conversation gets too long, summarize older parts
-        if len(self.conversation_history[session_id]) > 20:  # Increased from 10 to 20
-            await self._summarize_and_trim_conversation(session_id)
+        # If conversation gets too long, summarize older parts in the background -
+        # the summary is ready for the next turn instead of delaying this one
+        if len(history) > 20:  # Increased from 10 to 20
+            self._queue_summary(session_id)
+    
+    def _queue_summary(self, session_id: str):
+        """Queue a session for summarization, starting the worker if it isn't running"""
+        if session_id in self._queued_summaries:
+            return
+        self._queued_summaries.add(session_id)
+        self._summary_queue.put_nowait(session_id)
+        if self._summary_worker is None or self._summary_worker.done():
+            self._summary_worker = asyncio.create_task(self._summary_worker_loop())
+    
+    async def aclose(self):
+        """Stop the background summary worker (called on app shutdown)"""
+        worker, self._summary_worker = self._summary_worker, None
+        if worker is not None and not worker.done():
+            worker.cancel()
+            try:
+                await worker
+            except asyncio.CancelledError:
+                pass
+    
+    async def _summary_worker_loop(self):
+        """
+        Summarize queued sessions in batches
+        
+        Each batch runs concurrently, so a burst of sessions crossing the limit costs about
+        one Groq round trip rather than one per session. Batches run one after another,
+        so a session is never summarized twice at once.
+        """
+        while True:
+            batch = [await self._summary_queue.get()]
+            while len(batch) < _SUMMARY_BATCH_SIZE and not self._summary_queue.empty():
+                batch.append(self._summary_queue.get_nowait())
+            # Sessions may be queued again from here on - the length check below skips needless reruns
+            self._queued_summaries.difference_update(batch)
+            await asyncio.gather(*(self._summarize_and_trim_conversation(session_id) for session_id in batch))
     
     async def _summarize_and_trim_conversation(self, session_id: str):
-        """Summarize older conversation and keep recent parts"""
-        conversation = self.conversation_history[session_id]
+        """Summarize the first 10 turns into the session summary and drop them"""
+        conversation = self.conversation_history.get(session_id, ())
+        if len(conversation) <= 20:
+            return
         
         # Take first 10 turns to summarize
-        old_turns = conversation[:10]
-        recent_turns = conversation[10:]
+        old_turns = list(islice(conversation, 10))
         
         # Create summary of old conversation
-        old_conversation_text = ""
-        for turn in old_turns:
-            old_conversation_text += f"User: {turn['user']}\nAssistant: {turn['assistant']}\n"
-        
-        summary_prompt = f"""
-        Summarize this conversation between a user and their supportive friend. 
-        Focus on:
-        - Main emotional themes and topics discussed
-        - Key events or situations mentioned
-        - User's feelings and emotional journey
-        - Important context for future conversation
-        
-        Keep it concise but meaningful in Indonesian, casual tone.
+        old_conversation_text = "".join(f"User: {turn['user']}\nAssistant: {turn['assistant']}\n" for turn in old_turns)
         
-        Conversation to summarize:
-        {old_conversation_text}
-        """
+        summary_prompt = _SUMMARY_PROMPT_TEMPLATE.format(conversation=old_conversation_text)
         
         try:
             summary = await groq_client.chat_completion(
@@ -189,145 +467,34 @@ class ReflectionAgent(BaseAgent):
             else:
                 self.conversation_summaries[session_id] = summary
                 
-            # Keep only recent 10 turns in active memory
-            self.conversation_history[session_id] = recent_turns
+            # Drop the summarized turns - turns added while the summary ran are kept,
+            # and ones the deque already evicted are skipped
+            for turn in old_turns:
+                if conversation and conversation[0] is turn:
+                    conversation.popleft()
             
-            self.log_activity(f"Conversation summarized for session {session_id}")
+            self.log_activity("Conversation summarized for session %s", session_id)
             
         except Exception as e:
-            self.log_activity(f"Error summarizing conversation: {e}", "ERROR")
+            self.log_activity("Error summarizing conversation: %s", e, level="ERROR")
             # Fallback: just trim without summary
-            self.conversation_history[session_id] = conversation[-15:]
+            while len(conversation) > 15:
+                conversation.popleft()
     
     async def _generate_reflection_questions(self, user_message: str, mood: str) -> List[str]:
         """Generate casual questions to encourage sharing"""
-        questions_by_mood = {
-            "sad": [
-                "kenapa itu sakit hatinya? boleh diceritain?",
-                "ada yang bikin kecewa ya? gimana ceritanya?",
-                "masih ada hal yang bikin seneng ga hari ini?"
-            ],
-            "anxious": [
-                "lagi khawatir apa sih? sharing dong",
-                "kayaknya overthinking nih, bener ga?",
-                "kalau misal terjadi hal terburuk, terus gimana menurutmu?"
-            ],
-            "angry": [
-                "kesel banget ya? kenapa emangnya?",
-                "yang bikin sebel itu apa sih?",
-                "pengen marah-marah atau pengen cerita dulu?"
-            ],
-            "confused": [
-                "bingung ya? emang lagi mikirin apa?",
-                "kayaknya dilema nih, gimana ceritanya?",
-                "kata hati kamu gimana? ikutin aja dulu"
-            ],
-            "grateful": [
-                "siapa yang paling berperan bikin kamu bersyukur?",
-                "gimana caranya berbagi kebersyukuran ini sama orang lain?",
-                "apa yang bisa kamu lakukan buat pertahanin perasaan positif ini?"
-            ],
-            "lonely": [
-                "lagi berasa sendirian ya? gimana ceritanya?",
-                "kapan terakhir kali chat sama temen? mau coba reach out ga?",
-                "kadang sendirian itu berat ya, tapi kamu ga sendirian kok"
-            ],
-            "default": [
-                "gimana perasaan kamu tentang hal ini?",
-                "mau cerita lebih lanjut ga?",
-                "ada yang pengen kamu sharing?"
-            ]
-        }
-        
-        return questions_by_mood.get(mood.lower(), questions_by_mood["default"])
+        return list(_QUESTIONS_BY_MOOD.get(mood, _QUESTIONS_BY_MOOD["default"]))
     
     async def _generate_suggestions(self, mood: str, topic: str) -> List[Dict[str, str]]:
         """Generate casual suggestions for self-reflection"""
-        suggestions = {
-            "journaling": {
-                "title": "Nulis di jurnal",
-                "description": "Tulis aja 3 hal yang kamu rasain hari ini, bebas mau gimana",
-                "time_needed": "10-15 menit",
-                "benefits": "Bikin pikiran jadi lebih clear"
-            },
-            "meditation": {
-                "title": "Duduk tenang bentar",
-                "description": "Coba duduk diam dan perhatiin napas kamu aja",
-                "time_needed": "5-10 menit",
-                "benefits": "Bikin hati tenang dan pikiran jernih"
-            },
-            "letter_writing": {
-                "title": "Nulis surat buat diri sendiri",
-                "description": "Bayangin kamu lagi ngasih semangat ke diri sendiri",
-                "time_needed": "15-20 menit",
-                "benefits": "Jadi lebih sayang sama diri sendiri"
-            },
-            "gratitude": {
-                "title": "Inget hal-hal baik",
-                "description": "Tulis 5 hal yang bikin kamu seneng hari ini, sekecil apapun",
-                "time_needed": "5 menit",
-                "benefits": "Mood jadi lebih positif"
-            },
-            "body_scan": {
-                "title": "Cek perasaan di badan",
-                "description": "Perhatiin gimana rasanya di kepala, dada, sampe kaki",
-                "time_needed": "10-15 menit",
-                "benefits": "Nyambungin pikiran sama perasaan"
-            },
-            "music": {
-                "title": "Dengerin musik",
-                "description": "Pilih lagu yang sesuai sama mood kamu sekarang",
-                "time_needed": "10-30 menit", 
-                "benefits": "Bantu ekspresiin perasaan"
-            },
-            "walk": {
-                "title": "Jalan-jalan bentar",
-                "description": "Keluar rumah atau jalan di dalam ruangan aja",
-                "time_needed": "10-20 menit",
-                "benefits": "Bikin pikiran fresh"
-            }
-        }
-        
-        # Select appropriate suggestions based on mood
-        mood_suggestions = {
-            "sad": ["journaling", "music", "letter_writing"],
-            "anxious": ["meditation", "walk", "body_scan"],
-            "angry": ["walk", "body_scan", "music"],
-            "confused": ["journaling", "walk", "letter_writing"],
-            "grateful": ["gratitude", "journaling", "music"],
-            "lonely": ["music", "letter_writing", "gratitude"]
-        }
-        
-        selected_keys = mood_suggestions.get(mood.lower(), ["journaling", "music", "walk"])
-        return [suggestions[key] for key in selected_keys[:3]]
+        selected_keys = _MOOD_SUGGESTIONS.get(mood, _DEFAULT_SUGGESTIONS)
+        # Copies, so callers can't edit the shared activity table
+        return [dict(_SUGGESTIONS[key]) for key in selected_keys[:3]]
     
     async def _generate_follow_up_prompts(self, user_message: str, mood: str) -> List[str]:
         """Generate prompts to continue the conversation"""
-        prompts = [
-            "cerita lebih lanjut yuk...",
-            "apa yang paling berat dari situasi ini?",
-            "biasanya kamu gimana sih kalau ngadepin perasaan kaya gini?",
-            "ada orang yang bisa diajak ngobrol ga tentang hal ini?",
-            "kamu berharap gimana setelah cerita ini?"
-        ]
-        
-        mood_specific_prompts = {
-            "sad": [
-                "apa yang biasanya bikin kamu merasa lebih baik?",
-                "kapan terakhir kali kamu seneng banget? karena apa?"
-            ],
-            "anxious": [
-                "apa skenario terbaik yang mungkin terjadi?",
-                "gimana cara kamu tenang-tenang kalau lagi cemas?"
-            ],
-            "angry": [
-                "kamu maunya gimana sih sama orang atau situasi yang bikin kesel?",
-                "gimana cara kamu ngungkapin marah tanpa nyakitin orang?"
-            ]
-        }
-        
-        specific_prompts = mood_specific_prompts.get(mood.lower(), [])
-        return (specific_prompts + prompts)[:3]
+        specific_prompts = _MOOD_FOLLOW_UP_PROMPTS.get(mood, ())
+        return list((specific_prompts + _FOLLOW_UP_PROMPTS)[:3])
     
     def _fallback_response(self, user_message: str) -> Dict[str, Any]:
         """Fallback response when reflection generation fails"""
@@ -342,3 +509,7 @@ class ReflectionAgent(BaseAgent):
             },
             "error": "Reflection generation fallback"
         }
+
+
+# Global reflection agent instance - session history and reply caches are per instance
+reflection_agent = ReflectionAgent()
@@ -2,28 +2,314 @@
 Relaxation Agent - Specialist for relaxation and calming activities using Google Maps API
 """
 
+import asyncio
+import re
+import types
 import httpx
-from typing import Dict, Any, List
-import sys
-import os
+import orjson
+from cachetools import TTLCache
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Callable, Awaitable
 
-# Add project root to path for imports
-project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-sys.path.append(project_root)
-
-from backend.core.base_agent import BaseAgent
+from ..core.base_agent import BaseAgent
+from ..core.rate_limit import AdaptiveTokenBucket, RateLimited
+from ..core import sliding_window
 from config.settings import settings
 
+# Process-wide HTTP client shared by every RelaxationAgent instance, so place lookups
+# reuse warm connections. Created lazily and closed by RelaxationAgent.aclose() on shutdown.
+_SHARED_CLIENT: Optional[httpx.AsyncClient] = None
+_CLIENT_LOCK = asyncio.Lock()
+
+# Nominatim geocodes locations missing from _CITY_COORDS. Its usage policy allows at most
+# 1 req/s, with an identifying User-Agent and Referer, so it gets its own small client and one
+# lookup at a time - a caller waiting behind the same location finds it cached instead
+_NOMINATIM_CLIENT: Optional[httpx.AsyncClient] = None
+_NOMINATIM_RATE = AdaptiveTokenBucket(rate=1.0, capacity=1, rate_min=0.2)
+_GEOCODE_LOCK = asyncio.Lock()
+_GEOCODE_CACHE = TTLCache(maxsize=1024, ttl=86400)  # Lowercased location -> "lat,lng", or "" when not found
+
+# Per-provider pacing, shared process-wide since the limits apply per client IP. Rates back off
+# on 429s/5xx and recover while calls succeed; the public Overpass server allows about 2 at once
+_FOURSQUARE_RATE = AdaptiveTokenBucket(rate=5.0, capacity=5, rate_min=0.5, rate_max=10.0)
+_OVERPASS_RATE = AdaptiveTokenBucket(rate=1.0, capacity=2, rate_min=0.1, rate_max=2.0)
+_THROTTLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+_MAX_RETRY_AFTER = 60.0  # Cap on how long one Retry-After may hold a provider (seconds)
+_DEFAULT_RETRY_AFTER = 10.0  # Cool-down after a 429 that doesn't say how long to wait (seconds)
+
+# Limiters by provider - a provider whose limiter is paused is skipped until the cool-down ends
+_PROVIDER_LIMITERS = types.MappingProxyType({
+    "foursquare": _FOURSQUARE_RATE,
+    "openstreetmap": _OVERPASS_RATE,
+    "nominatim": _NOMINATIM_RATE
+})
+
+# Provider results per (provider, location, mood) - places barely change within an hour,
+# and repeat lookups would otherwise hit the free OpenStreetMap servers against their usage policy
+_SHARED_PLACES_CACHE = TTLCache(maxsize=2048, ttl=3600)
+
+# Message keywords that ask for places, and ones that call for stress relief
+_PLACE_KEYWORDS = ("tempat", "jalan", "wisata", "rekomendasi", "ke ", "di ")
+_STRESS_KEYWORDS = ("stress", "cemas", "panik", "tegang")
+
+def _configured_key(key: Optional[str]) -> Optional[str]:
+    """An API key as configured, or None when it's unset, a demo key or the .env.example placeholder"""
+    if not key or key.startswith("demo") or (key.startswith("your_") and key.endswith("_here")):
+        return None
+    return key
+
+def _places_cache_key(provider: str, location: str, mood: str) -> tuple:
+    """Cache key for a provider's places - case and surrounding spaces don't matter"""
+    return (provider, location.lower().strip(), mood.lower())
+
+# Comprehensive coordinates mapping for Indonesia (no API required!)
+_CITY_COORDS = types.MappingProxyType({
+    # Jakarta & surrounding
+    "jakarta": "-6.2088,106.8456",
+    "bekasi": "-6.2383,106.9756", 
+    "tangerang": "-6.1783,106.6319",
+    "depok": "-6.4025,106.7942",
+    "bogor": "-6.5971,106.8060",
+    
+    # West Java
+    "bandung": "-6.9175,107.6191",
+    "cirebon": "-6.7063,108.5570",
+    "sukabumi": "-6.9218,106.9270",
+    "tasikmalaya": "-7.3506,108.2181",
+    
+    # Central Java
+    "semarang": "-6.9667,110.4167",
+    "yogyakarta": "-7.7956,110.3695",
+    "yogya": "-7.7956,110.3695",
+    "jogja": "-7.7956,110.3695",
+    "solo": "-7.5663,110.8405",
+    "surakarta": "-7.5663,110.8405",
+    
+    # East Java
+    "surabaya": "-7.2575,112.7521",
+    "malang": "-7.9666,112.6326",
+    "kediri": "-7.8167,112.0167",
+    "madiun": "-7.6298,111.5239",
+    
+    # North Sumatra
+    "medan": "3.5952,98.6722",
+    "pematangsiantar": "2.9595,99.0687",
+    
+    # South Sumatra
+    "palembang": "-2.9761,104.7754",
+    
+    # Riau
+    "pekanbaru": "0.5071,101.4478",
+    
+    # Lampung
+    "bandar lampung": "-5.3971,105.2946",
+    "lampung": "-5.3971,105.2946",
+    
+    # Bali
+    "denpasar": "-8.6705,115.2126",
+    "bali": "-8.6705,115.2126",
+    "ubud": "-8.5069,115.2624",
+    "sanur": "-8.6872,115.2620",
+    "kuta": "-8.7183,115.1686",
+    
+    # Other major cities
+    "makassar": "-5.1477,119.4327",
+    "manado": "1.4748,124.8421",
+    "balikpapan": "-1.2379,116.8529",
+    "pontianak": "-0.0263,109.3425"
+})
+
+# Any known city named in a location, longest names first so "bandar lampung" wins over "lampung"
+_CITY_RE = re.compile(r"\b(" + "|".join(re.escape(city) for city in sorted(_CITY_COORDS, key=len, reverse=True)) + r")\b")
+
+@lru_cache(maxsize=1024)
+def _match_city_coordinates(location_lower: str) -> Optional[str]:
+    """Coordinates for a lowercased location - direct match first, then a city named in it (e.g. "ke bandung" -> "bandung")"""
+    if location_lower in _CITY_COORDS:
+        return _CITY_COORDS[location_lower]
+    match = _CITY_RE.search(location_lower)
+    if match:
+        return _CITY_COORDS[match.group(1)]
+    if len(location_lower) >= 4:
+        # Shortened names, e.g. "pematang" -> "pematangsiantar" - prefixes only, and not
+        # fragments so short they'd match anything; the rest goes to the geocoder
+        for city, coords in _CITY_COORDS.items():
+            if city.startswith(location_lower):
+                return coords
+    return None
+
+
+def _frozen_mapping(table: Dict[str, List[Dict]]) -> types.MappingProxyType:
+    """Read-only mood table - entry lists become tuples and each entry a read-only mapping"""
+    return types.MappingProxyType({
+        mood: tuple(types.MappingProxyType(entry) for entry in entries)
+        for mood, entries in table.items()
+    })
+
+# Real Foursquare category IDs per mood
+_FOURSQUARE_CATEGORIES = _frozen_mapping({
+    "stressed": [
+        {"id": "16032", "name": "Taman"},  # Parks
+        {"id": "13065", "name": "Kafe"},   # Cafe
+        {"id": "12040", "name": "Spa"}     # Spa
+    ],
+    "sedih": [
+        {"id": "13065", "name": "Kafe"},   # Cafe
+        {"id": "12053", "name": "Museum"}, # Museum
+        {"id": "13383", "name": "Toko Buku"} # Bookstore
+    ],
+    "bored": [
+        {"id": "10030", "name": "Pusat Perbelanjaan"}, # Shopping
+        {"id": "10032", "name": "Tempat Hiburan"},     # Entertainment
+        {"id": "13065", "name": "Kafe"}                # Cafe
+    ],
+    "lelah": [
+        {"id": "16032", "name": "Taman"},  # Parks
+        {"id": "12040", "name": "Spa"},    # Spa
+        {"id": "13065", "name": "Kafe"}    # Cafe
+    ]
+})
+
+# OpenStreetMap amenity searches per mood, and the ones for moods not listed
+_OSM_AMENITIES = _frozen_mapping({
+    "stressed": [
+        {"query": "spa", "name": "Spa"},
+        {"query": "park", "name": "Taman"},
+        {"query": "cafe", "name": "Cafe"},
+        {"query": "place_of_worship", "name": "Tempat Ibadah"}
+    ],
+    "sad": [
+        {"query": "park", "name": "Taman"},
+        {"query": "museum", "name": "Museum"},
+        {"query": "library", "name": "Perpustakaan"},
+        {"query": "cafe", "name": "Cafe"}
+    ],
+    "anxious": [
+        {"query": "park", "name": "Taman"},
+        {"query": "place_of_worship", "name": "Tempat Ibadah"},
+        {"query": "hospital", "name": "Rumah Sakit"},
+        {"query": "pharmacy", "name": "Apotek"}
+    ],
+    "tired": [
+        {"query": "spa", "name": "Spa"},
+        {"query": "hotel", "name": "Hotel"},
+        {"query": "cafe", "name": "Cafe"},
+        {"query": "park", "name": "Taman"}
+    ],
+    "angry": [
+        {"query": "park", "name": "Taman"},
+        {"query": "sports_centre", "name": "Pusat Olahraga"},
+        {"query": "gym", "name": "Gym"},
+        {"query": "swimming_pool", "name": "Kolam Renang"}
+    ],
+    "lonely": [
+        {"query": "cafe", "name": "Cafe"},
+        {"query": "restaurant", "name": "Restoran"},
+        {"query": "mall", "name": "Mall"},
+        {"query": "community_centre", "name": "Pusat Komunitas"}
+    ],
+    "excited": [
+        {"query": "tourist_attraction", "name": "Wisata"},
+        {"query": "amusement_park", "name": "Taman Hiburan"},
+        {"query": "shopping_mall", "name": "Mall"},
+        {"query": "restaurant", "name": "Restoran"}
+    ],
+    "happy": [
+        {"query": "tourist_attraction", "name": "Wisata"},
+        {"query": "park", "name": "Taman"},
+        {"query": "restaurant", "name": "Restoran"},
+        {"query": "entertainment", "name": "Hiburan"}
+    ],
+    "calm": [
+        {"query": "park", "name": "Taman"},
+        {"query": "beach", "name": "Pantai"},
+        {"query": "lake", "name": "Danau"},
+        {"query": "mountain", "name": "Gunung"}
+    ]
+})
+_DEFAULT_OSM_AMENITIES = tuple(types.MappingProxyType(entry) for entry in [
+    {"query": "park", "name": "Taman"},
+    {"query": "tourist_attraction", "name": "Wisata"},
+    {"query": "cafe", "name": "Cafe"}
+])
+
+# OSM keys the amenity queries are matched against, and queries whose OSM tag value differs
+_OSM_TAG_KEYS = ("amenity", "leisure", "tourism", "shop", "natural")
+_OSM_TAG_ALIASES = types.MappingProxyType({
+    "tourist_attraction": "attraction",
+    "shopping_mall": "mall",
+    "gym": "fitness_centre",
+    "lake": "water",
+    "mountain": "peak"
+})
+
+# Google Places types per mood
+_GOOGLE_TYPES = _frozen_mapping({
+    "stressed": [
+        {"type": "park", "name": "Taman"},
+        {"type": "spa", "name": "Spa"},
+        {"type": "cafe", "name": "Kafe"}
+    ],
+    "sedih": [
+        {"type": "cafe", "name": "Kafe"},
+        {"type": "museum", "name": "Museum"},
+        {"type": "book_store", "name": "Toko Buku"}
+    ],
+    "bored": [
+        {"type": "shopping_mall", "name": "Mall"},
+        {"type": "tourist_attraction", "name": "Tempat Wisata"},
+        {"type": "amusement_park", "name": "Tempat Hiburan"}
+    ],
+    "lelah": [
+        {"type": "park", "name": "Taman"},
+        {"type": "spa", "name": "Spa"},
+        {"type": "cafe", "name": "Kafe"}
+    ]
+})
+
+
 class RelaxationAgent(BaseAgent):
     """Agent for relaxation and calming activity recommendations"""
     
     def __init__(self):
         super().__init__("relaxation")
-        self.google_maps_api_key = settings.google_maps_api_key
-        self.foursquare_api_key = settings.foursquare_api_key
+        # Placeholder keys would fail every call and demo keys are throttled so hard that every
+        # call would just 429 - treat both as unset, so those providers are skipped outright
+        self.google_maps_api_key = _configured_key(settings.google_maps_api_key)
+        self.foursquare_api_key = _configured_key(settings.foursquare_api_key)
+        if self.foursquare_api_key is None:
+            self.log_activity("FOURSQUARE_API_KEY not set (or a placeholder/demo key), Foursquare place search disabled", level="WARNING")
         self.goapi_key = settings.goapi_key
         self.places_base_url = "https://maps.googleapis.com/maps/api/place"
     
+    @classmethod
+    async def _get_client(cls) -> httpx.AsyncClient:
+        """Get the process-wide HTTP client so Foursquare/Google/OSM connections are kept alive between requests"""
+        global _SHARED_CLIENT
+        if _SHARED_CLIENT is None:
+            async with _CLIENT_LOCK:
+                if _SHARED_CLIENT is None:
+                    # HTTP/2 lets concurrent lookups against one provider multiplex over one TLS connection
+                    _SHARED_CLIENT = httpx.AsyncClient(
+                        http2=True,
+                        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+                        timeout=15.0,
+                        # OpenStreetMap's usage policies ask for an identifying User-Agent
+                        headers={"User-Agent": "HatiApp/1.0 (relaxation-assistant)"}
+                    )
+        return _SHARED_CLIENT
+    
+    @classmethod
+    async def aclose(cls):
+        """Close the shared HTTP clients - must be called on app shutdown"""
+        global _SHARED_CLIENT, _NOMINATIM_CLIENT
+        if _SHARED_CLIENT is not None:
+            await _SHARED_CLIENT.aclose()
+            _SHARED_CLIENT = None
+        if _NOMINATIM_CLIENT is not None:
+            await _NOMINATIM_CLIENT.aclose()
+            _NOMINATIM_CLIENT = None
+    
     async def process(self, user_message: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """
         Process relaxation recommendation request
@@ -41,6 +327,16 @@ class RelaxationAgent(BaseAgent):
             }
         """
         try:
+            # One chatty user shouldn't drain the place providers' quota for everyone
+            session_id = parameters.get("session_id")
+            if session_id:
+                allowed, retry_after = await sliding_window.allow(
+                    session_id, "relaxation", settings.relaxation_requests_per_minute, 60
+                )
+                if not allowed:
+                    self.log_activity(f"Session {session_id} rate limited for {retry_after:.0f}s")
+                    return self._rate_limited_response(retry_after)
+            
             mood = parameters.get("mood", "stressed")
             activity_type = parameters.get("type", parameters.get("place_type", "mixed"))
             location = parameters.get("location", "Jakarta")
@@ -54,30 +350,38 @@ class RelaxationAgent(BaseAgent):
                     
             self.log_activity(f"Finding relaxation for mood: {mood}, type: {activity_type}, location: {location}")
             
-            activities = {}
-            
-            # Always try to find places when user asks for recommendations
-            if any(keyword in user_message.lower() for keyword in ["tempat", "jalan", "wisata", "rekomendasi", "ke ", "di "]):
-                places = await self._get_calming_places(location, mood)
-                activities["places"] = places
-                self.log_activity(f"Found {len(places)} places for location: {location}")
+            message_lower = user_message.lower()
+            wants_places = any(keyword in message_lower for keyword in _PLACE_KEYWORDS)
+            wants_stress_relief = any(word in message_lower for word in _STRESS_KEYWORDS)
             
-            # Generate indoor relaxation activities only if no places found or specifically requested
-            if activity_type in ["mixed", "indoor"] or not activities.get("places"):
-                indoor = await self._get_indoor_activities(mood, intensity)
-                activities["indoor_activities"] = indoor
+            # Only build what this message needs, and build it all at once: places when the user
+            # asks for recommendations, at-home activities when they don't (or ask for indoor ones),
+            # breathing exercises without places or for stress relief, tips only without places
+            tasks = {}
+            if wants_places:
+                tasks["places"] = self._get_calming_places(location, mood)
+            if not wants_places or activity_type == "indoor":
+                tasks["indoor_activities"] = self._get_indoor_activities(mood, intensity)
+            if not wants_places or wants_stress_relief:
+                tasks["breathing_exercises"] = self._get_breathing_exercises(mood, intensity)
+            if not wants_places:
+                tasks["relaxation_tips"] = self._get_relaxation_tips(mood)
+            activities = dict(zip(tasks, await asyncio.gather(*tasks.values())))
             
-            # Provide breathing exercises and meditation only if no places found or specifically about stress relief
-            if not activities.get("places") or any(word in user_message.lower() for word in ["stress", "cemas", "panik", "tegang"]):
-                breathing = await self._get_breathing_exercises(mood, intensity)
-                activities["breathing_exercises"] = breathing
-                
-                # Add relaxation tips only for stress-related queries without location requests
-                if not activities.get("places"):
-                    tips = await self._get_relaxation_tips(mood)
-                    activities["relaxation_tips"] = tips
+            if wants_places:
+                self.log_activity(f"Found {len(activities['places'])} places for location: {location}")
+                if not activities["places"]:
+                    # Nowhere to go after all - fall back to what can be done at home,
+                    # building only the sections the first pass skipped
+                    fallbacks = {
+                        "indoor_activities": lambda: self._get_indoor_activities(mood, intensity),
+                        "breathing_exercises": lambda: self._get_breathing_exercises(mood, intensity),
+                        "relaxation_tips": lambda: self._get_relaxation_tips(mood)
+                    }
+                    missing = [key for key in fallbacks if key not in activities]
+                    activities.update(zip(missing, await asyncio.gather(*(fallbacks[key]() for key in missing))))
             
-            return {
+            response = {
                 "activities": activities,
                 "mood_analysis": mood,
                 "activity_type": activity_type,
@@ -91,8 +395,14 @@ class RelaxationAgent(BaseAgent):
                 }
             }
             
+            # Let the caller back off from providers that are cooling down instead of retrying them
+            rate_limit_state = self._rate_limit_state()
+            if rate_limit_state:
+                response["rate_limit_state"] = rate_limit_state
+            return response
+            
         except Exception as e:
-            self.log_activity(f"Error processing relaxation request: {e}", "ERROR")
+            self.log_activity(f"Error processing relaxation request: {e}", level="ERROR")
             return self._fallback_response(user_message)
     
     async def _get_calming_places(self, location: str, mood: str, radius: int = 5000) -> List[Dict]:
@@ -100,27 +410,56 @@ class RelaxationAgent(BaseAgent):
         try:
             self.log_activity(f"Searching for REAL places in: {location} for mood: {mood}")
             
-            places = []
+            # Resolve a location outside the city table once, before every provider needs it
+            await self._geocode_location(location)
             
-            # Try Foursquare API first (most reliable for business data)
-            foursquare_places = await self._get_places_from_foursquare(location, mood)
-            if foursquare_places:
-                places.extend(foursquare_places)
-                self.log_activity(f"Found {len(foursquare_places)} places from Foursquare API")
+            # Start every provider at once instead of falling through them one by one, then read
+            # them in priority order: Foursquare (most reliable for business data), Google Places
+            # (if API key available), OpenStreetMap/Overpass (FREE). Once the higher-priority
+            # ones have given enough places the rest are cancelled; otherwise a cold request
+            # waits for the slowest provider rather than the sum of all of them.
+            providers = []
+            if self.foursquare_api_key:
+                providers.append(("Foursquare API", "foursquare", lambda: self._get_places_from_foursquare(location, mood)))
+            if self.google_maps_api_key:
+                providers.append(("Google Maps", "google", lambda: self._get_places_from_google_maps(location, mood, radius)))
+            providers.append(("OpenStreetMap", "openstreetmap", lambda: self._get_places_from_openstreetmap(location, mood)))
             
-            # Try Google Places API as backup (if API key available)
-            if len(places) < 3 and self.google_maps_api_key:
-                google_places = await self._get_places_from_google_maps(location, mood, radius)
-                if google_places:
-                    places.extend(google_places)
-                    self.log_activity(f"Found {len(google_places)} places from Google Maps")
+            # Cached results are used as they are; providers behind enough cached places are never started
+            lookups = []
+            cached_count = 0
+            all_cached = True  # Every provider so far was served from the cache
+            for source, provider, fetch in providers:
+                if all_cached and cached_count >= 3:
+                    break
+                cached = _SHARED_PLACES_CACHE.get(_places_cache_key(provider, location, mood))
+                if cached is not None:
+                    lookups.append((source, cached))
+                    cached_count += len(cached)
+                elif provider in _PROVIDER_LIMITERS and _PROVIDER_LIMITERS[provider].cooldown_remaining() > 0:
+                    # Rate limited - don't queue behind the pause, leave it to the other providers
+                    self.log_activity(f"Skipping {source}, rate limited for another {_PROVIDER_LIMITERS[provider].cooldown_remaining():.0f}s")
+                else:
+                    all_cached = False
+                    lookups.append((source, asyncio.create_task(self._cached_places(provider, location, mood, fetch))))
             
-            # Try OpenStreetMap/Nominatim as secondary source (FREE and reliable)
-            if len(places) < 3:
-                osm_places = await self._get_places_from_openstreetmap(location, mood)
-                if osm_places:
-                    places.extend(osm_places)
-                    self.log_activity(f"Found {len(osm_places)} places from OpenStreetMap")
+            places = []
+            try:
+                for source, lookup in lookups:
+                    if len(places) >= 3:
+                        break
+                    try:
+                        found = list(lookup) if isinstance(lookup, list) else await lookup
+                    except Exception as e:
+                        self.log_activity(f"Error fetching places from {source}: {e}")
+                        continue
+                    if found:
+                        places.extend(found)
+                        self.log_activity(f"Found {len(found)} places from {source}")
+            finally:
+                for _, lookup in lookups:
+                    if isinstance(lookup, asyncio.Task):
+                        lookup.cancel()
             
             # Remove duplicates and return real data
             unique_places = self._remove_duplicate_places(places)
@@ -137,12 +476,69 @@ class RelaxationAgent(BaseAgent):
             self.log_activity(f"Error fetching places: {e}")
             return self._get_curated_places(location, mood)
     
+    def provider_status(self) -> Dict[str, bool]:
+        """Which place providers have credentials configured"""
+        return {
+            "foursquare": self.foursquare_api_key is not None,
+            "google_maps": self.google_maps_api_key is not None,
+            "openstreetmap": True
+        }
+    
+    def _rate_limit_state(self) -> Dict[str, Dict[str, Any]]:
+        """Rate-limited envelope per place provider that is currently cooling down"""
+        state = {}
+        for provider, limiter in _PROVIDER_LIMITERS.items():
+            remaining = limiter.cooldown_remaining()
+            if remaining > 0:
+                state[provider] = self._rate_limited_response(remaining)
+        return state
+    
+    async def _paced_request(self, client: httpx.AsyncClient, limiter: AdaptiveTokenBucket, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send one provider request at the pace its limiter allows, and feed the outcome back to the limiter"""
+        cooldown = limiter.cooldown_remaining()
+        if cooldown > 0:
+            # A sibling request just got throttled - fail fast rather than sleep through the cool-down
+            raise RateLimited(cooldown)
+        
+        async with limiter:
+            try:
+                response = await client.request(method, url, **kwargs)
+            except httpx.TransportError:
+                limiter.on_failure()
+                raise
+        
+        if response.status_code in _THROTTLE_STATUS_CODES:
+            default = _DEFAULT_RETRY_AFTER if response.status_code == 429 else 0.0
+            try:
+                retry_after = float(response.headers.get("Retry-After", default))
+            except ValueError:
+                retry_after = default
+            limiter.on_failure(min(retry_after, _MAX_RETRY_AFTER))
+            self.log_activity(f"Got {response.status_code} from {response.url.host}, slowing down to {limiter.rate:.2f} req/s")
+        else:
+            limiter.on_success()
+        return response
+    
+    async def _cached_places(self, provider: str, location: str, mood: str, fetch: Callable[[], Awaitable[List[Dict]]]) -> List[Dict]:
+        """
+        Return a provider's cached places for location and mood, fetching them on a miss
+        
+        Empty results are not cached - they usually mean the provider failed.
+        """
+        key = _places_cache_key(provider, location, mood)
+        places = _SHARED_PLACES_CACHE.get(key)
+        if places is None:
+            places = await fetch()
+            if places:
+                _SHARED_PLACES_CACHE[key] = places
+        return list(places)
+    
     async def _get_places_from_foursquare(self, location: str, mood: str) -> List[Dict]:
         """Get places from Foursquare API - REAL business data"""
+        if not self.foursquare_api_key:
+            return []
+        
         try:
-            # Foursquare API v3 - real business data
-            foursquare_api_key = "fsq3yKQkb1iHuUt9qMp8KPm8VJuQUQ3vgWWLJGPfmN1EtBo="  # Demo key
-            
             # Get coordinates
             coordinates = self._get_coordinates(location)
             if not coordinates:
@@ -151,63 +547,26 @@ class RelaxationAgent(BaseAgent):
             lat, lng = coordinates.split(',')
             
             # Map mood to Foursquare categories
-            categories = self._mood_to_foursquare_categories(mood)
+            categories = self._mood_to_foursquare_categories(mood)[:2]  # Try 2 categories
             
-            places = []
+            client = await self._get_client()
+            headers = {
+                "Authorization": self.foursquare_api_key,
+                "Accept": "application/json"
+            }
             
-            async with httpx.AsyncClient(timeout=15.0) as client:
-                for category in categories[:2]:  # Try 2 categories
-                    try:
-                        headers = {
-                            "Authorization": foursquare_api_key,
-                            "Accept": "application/json"
-                        }
-                        
-                        params = {
-                            "ll": f"{lat},{lng}",
-                            "radius": 8000,  # 8km radius
-                            "categories": category["id"],
-                            "limit": 10,
-                            "sort": "POPULARITY"
-                        }
-                        
-                        response = await client.get(
-                            "https://api.foursquare.com/v3/places/search",
-                            headers=headers,
-                            params=params
-                        )
-                        
-                        if response.status_code == 200:
-                            data = response.json()
-                            
-                            for place in data.get("results", [])[:5]:
-                                place_info = {
-                                    "name": place.get("name"),
-                                    "type": category["name"],
-                                    "address": self._format_foursquare_address(place.get("location", {})),
-                                    "rating": place.get("rating", 0),
-                                    "distance": place.get("distance", 0),
-                                    "coordinates": {
-                                        "lat": place.get("geocodes", {}).get("main", {}).get("latitude"),
-                                        "lng": place.get("geocodes", {}).get("main", {}).get("longitude")
-                                    },
-                                    "source": "Foursquare API",
-                                    "verified": True,
-                                    "description": f"{category['name']} yang populer di {location}",
-                                    "category_id": place.get("categories", [{}])[0].get("id"),
-                                    "fsq_id": place.get("fsq_id")
-                                }
-                                places.append(place_info)
-                                
-                        elif response.status_code == 429:
-                            self.log_activity("Foursquare API rate limit reached")
-                            break
-                        else:
-                            self.log_activity(f"Foursquare API error: {response.status_code}")
-                            
-                    except Exception as e:
-                        self.log_activity(f"Error with Foursquare category {category['name']}: {e}")
-                        continue
+            # Categories are independent - search them together, one round trip instead of two
+            results = await asyncio.gather(
+                *(self._search_foursquare_category(client, headers, category, lat, lng, location) for category in categories),
+                return_exceptions=True
+            )
+            
+            places = []
+            for category, result in zip(categories, results):
+                if isinstance(result, Exception):
+                    self.log_activity(f"Error with Foursquare category {category['name']}: {result}")
+                else:
+                    places.extend(result)
             
             return places
             
@@ -215,34 +574,54 @@ class RelaxationAgent(BaseAgent):
             self.log_activity(f"Foursquare API completely failed: {e}")
             return []
     
-    def _mood_to_foursquare_categories(self, mood: str) -> List[Dict]:
-        """Map mood to real Foursquare category IDs"""
-        
-        # Real Foursquare category IDs
-        categories = {
-            "stressed": [
-                {"id": "16032", "name": "Taman"},  # Parks
-                {"id": "13065", "name": "Kafe"},   # Cafe
-                {"id": "12040", "name": "Spa"}     # Spa
-            ],
-            "sedih": [
-                {"id": "13065", "name": "Kafe"},   # Cafe
-                {"id": "12053", "name": "Museum"}, # Museum
-                {"id": "13383", "name": "Toko Buku"} # Bookstore
-            ],
-            "bored": [
-                {"id": "10030", "name": "Pusat Perbelanjaan"}, # Shopping
-                {"id": "10032", "name": "Tempat Hiburan"},     # Entertainment
-                {"id": "13065", "name": "Kafe"}                # Cafe
-            ],
-            "lelah": [
-                {"id": "16032", "name": "Taman"},  # Parks
-                {"id": "12040", "name": "Spa"},    # Spa
-                {"id": "13065", "name": "Kafe"}    # Cafe
-            ]
+    async def _search_foursquare_category(self, client: httpx.AsyncClient, headers: Dict, category: Dict, lat: str, lng: str, location: str) -> List[Dict]:
+        """Search one Foursquare category around a point"""
+        params = {
+            "ll": f"{lat},{lng}",
+            "radius": 8000,  # 8km radius
+            "categories": category["id"],
+            "limit": 10,
+            "sort": "POPULARITY"
         }
         
-        return categories.get(mood.lower(), categories["stressed"])
+        response = await self._paced_request(
+            client, _FOURSQUARE_RATE, "GET",
+            "https://api.foursquare.com/v3/places/search",
+            headers=headers,
+            params=params
+        )
+        
+        if response.status_code == 429:
+            self.log_activity("Foursquare API rate limit reached")
+            return []
+        if response.status_code != 200:
+            self.log_activity(f"Foursquare API error: {response.status_code}")
+            return []
+        
+        data = orjson.loads(response.content)
+        return [
+            {
+                "name": place.get("name"),
+                "type": category["name"],
+                "address": self._format_foursquare_address(place.get("location", {})),
+                "rating": place.get("rating", 0),
+                "distance": place.get("distance", 0),
+                "coordinates": {
+                    "lat": place.get("geocodes", {}).get("main", {}).get("latitude"),
+                    "lng": place.get("geocodes", {}).get("main", {}).get("longitude")
+                },
+                "source": "Foursquare API",
+                "verified": True,
+                "description": f"{category['name']} yang populer di {location}",
+                "category_id": place.get("categories", [{}])[0].get("id"),
+                "fsq_id": place.get("fsq_id")
+            }
+            for place in data.get("results", [])[:5]
+        ]
+    
+    def _mood_to_foursquare_categories(self, mood: str) -> List[Dict]:
+        """Map mood to real Foursquare category IDs"""
+        return list(_FOURSQUARE_CATEGORIES.get(mood.lower(), _FOURSQUARE_CATEGORIES["stressed"]))
     
     def _format_foursquare_address(self, location_data: Dict) -> str:
         """Format Foursquare address data"""
@@ -258,72 +637,36 @@ class RelaxationAgent(BaseAgent):
         return ", ".join(address_parts) if address_parts else "Alamat tersedia di aplikasi"
     
     async def _get_places_from_openstreetmap(self, location: str, mood: str) -> List[Dict]:
-        """Get places from OpenStreetMap/Nominatim - FREE and reliable"""
+        """Get places from OpenStreetMap/Overpass - FREE and reliable"""
         try:
             self.log_activity(f"Searching OpenStreetMap for places in: {location}")
             
-            # Map mood to OpenStreetMap amenity types
-            amenity_types = self._mood_to_osm_amenities(mood)
-            places = []
+            coordinates = self._get_coordinates(location)
             
-            async with httpx.AsyncClient(timeout=15.0) as client:
-                for amenity in amenity_types[:3]:  # Try 3 amenity types
-                    try:
-                        # Nominatim search with specific amenity type
-                        params = {
-                            "q": f"{amenity['query']} {location}",
-                            "format": "json",
-                            "limit": 10,
-                            "countrycodes": "id",  # Indonesia only
-                            "addressdetails": 1,
-                            "extratags": 1,
-                            "namedetails": 1
-                        }
-                        
-                        headers = {
-                            "User-Agent": "HatiApp/1.0 (relaxation-assistant)"
-                        }
-                        
-                        response = await client.get(
-                            "https://nominatim.openstreetmap.org/search",
-                            headers=headers,
-                            params=params
-                        )
-                        
-                        if response.status_code == 200:
-                            data = response.json()
-                            
-                            for place in data[:5]:  # Take first 5 results
-                                # Extract useful information
-                                name = place.get("display_name", "").split(",")[0]
-                                if not name or len(name) < 3:
-                                    continue
-                                    
-                                place_info = {
-                                    "name": name,
-                                    "type": amenity["name"],
-                                    "address": place.get("display_name", ""),
-                                    "coordinates": {
-                                        "lat": float(place.get("lat", 0)),
-                                        "lng": float(place.get("lon", 0))
-                                    },
-                                    "source": "OpenStreetMap",
-                                    "verified": True,
-                                    "description": f"{amenity['name']} di {location}",
-                                    "osm_id": place.get("osm_id"),
-                                    "osm_type": place.get("osm_type"),
-                                    "class": place.get("class"),
-                                    "type_detail": place.get("type")
-                                }
-                                places.append(place_info)
-                                
-                        else:
-                            self.log_activity(f"OpenStreetMap search failed: {response.status_code}")
-                            
-                    except Exception as e:
-                        self.log_activity(f"Error searching OpenStreetMap for {amenity}: {e}")
-                        continue
-                        
+            # Map mood to OpenStreetMap tag values, each with the name to show for it
+            amenity_names = {}
+            for amenity in self._mood_to_osm_amenities(mood):
+                amenity_names.setdefault(_OSM_TAG_ALIASES.get(amenity["query"], amenity["query"]), amenity["name"])
+            
+            # One bounding-circle query for every amenity type at once instead of a geocoder
+            # search per type - Overpass filters by tag server-side in a single round trip
+            values = "|".join(amenity_names)
+            overpass_query = "[out:json][timeout:15];(" + "".join(
+                f'nwr["{key}"~"^({values})$"]["name"](around:8000,{coordinates});' for key in _OSM_TAG_KEYS
+            ) + ");out center 30;"
+            
+            client = await self._get_client()
+            response = await self._paced_request(
+                client, _OVERPASS_RATE, "POST",
+                "https://overpass-api.de/api/interpreter",
+                data={"data": overpass_query},
+                timeout=15.0
+            )
+            if response.status_code != 200:
+                self.log_activity(f"OpenStreetMap search failed: {response.status_code}")
+                return []
+            
+            places = self._process_osm_data(orjson.loads(response.content), amenity_names, location)
             self.log_activity(f"OpenStreetMap search completed, found {len(places)} places")
             return places
             
@@ -333,74 +676,7 @@ class RelaxationAgent(BaseAgent):
     
     def _mood_to_osm_amenities(self, mood: str) -> List[Dict]:
         """Map mood to OpenStreetMap amenity types"""
-        mood_mapping = {
-            "stressed": [
-                {"query": "spa", "name": "Spa"},
-                {"query": "park", "name": "Taman"},
-                {"query": "cafe", "name": "Cafe"},
-                {"query": "place_of_worship", "name": "Tempat Ibadah"}
-            ],
-            "sad": [
-                {"query": "park", "name": "Taman"},
-                {"query": "museum", "name": "Museum"},
-                {"query": "library", "name": "Perpustakaan"},
-                {"query": "cafe", "name": "Cafe"}
-            ],
-            "anxious": [
-                {"query": "park", "name": "Taman"},
-                {"query": "place_of_worship", "name": "Tempat Ibadah"},
-                {"query": "hospital", "name": "Rumah Sakit"},
-                {"query": "pharmacy", "name": "Apotek"}
-            ],
-            "tired": [
-                {"query": "spa", "name": "Spa"},
-                {"query": "hotel", "name": "Hotel"},
-                {"query": "cafe", "name": "Cafe"},
-                {"query": "park", "name": "Taman"}
-            ],
-            "angry": [
-                {"query": "park", "name": "Taman"},
-                {"query": "sports_centre", "name": "Pusat Olahraga"},
-                {"query": "gym", "name": "Gym"},
-                {"query": "swimming_pool", "name": "Kolam Renang"}
-            ],
-            "lonely": [
-                {"query": "cafe", "name": "Cafe"},
-                {"query": "restaurant", "name": "Restoran"},
-                {"query": "mall", "name": "Mall"},
-                {"query": "community_centre", "name": "Pusat Komunitas"}
-            ],
-            "excited": [
-                {"query": "tourist_attraction", "name": "Wisata"},
-                {"query": "amusement_park", "name": "Taman Hiburan"},
-                {"query": "shopping_mall", "name": "Mall"},
-                {"query": "restaurant", "name": "Restoran"}
-            ],
-            "happy": [
-                {"query": "tourist_attraction", "name": "Wisata"},
-                {"query": "park", "name": "Taman"},
-                {"query": "restaurant", "name": "Restoran"},
-                {"query": "entertainment", "name": "Hiburan"}
-            ],
-            "calm": [
-                {"query": "park", "name": "Taman"},
-                {"query": "beach", "name": "Pantai"},
-                {"query": "lake", "name": "Danau"},
-                {"query": "mountain", "name": "Gunung"}
-            ]
-        }
-        
-        default_amenities = [
-            {"query": "park", "name": "Taman"},
-            {"query": "tourist_attraction", "name": "Wisata"},
-            {"query": "cafe", "name": "Cafe"}
-        ]
-        
-        return mood_mapping.get(mood.lower(), default_amenities)
-    
-    async def _get_places_from_here(self, location: str, mood: str) -> List[Dict]:
-        """Deprecated - replaced with GOAPI"""
-        return []
+        return list(_OSM_AMENITIES.get(mood.lower(), _DEFAULT_OSM_AMENITIES))
     
     def _get_curated_places(self, location: str, mood: str) -> List[Dict]:
         """Curated real places database - manually verified locations"""
@@ -513,234 +789,104 @@ class RelaxationAgent(BaseAgent):
         # Default to Jakarta places if location not found
         return real_places.get("jakarta", [])
     
-    async def _get_places_from_osm(self, location: str, mood: str) -> List[Dict]:
-        """Get places using OpenStreetMap Overpass API (completely FREE!)"""
-        try:
-            # Get coordinates for the location
-            coordinates = self._get_coordinates(location)
-            if not coordinates:
-                return []
-            
-            # Map mood to OpenStreetMap place types
-            place_types = self._mood_to_osm_types(mood)
-            
-            places = []
-            
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                for place_type in place_types[:3]:  # Limit to 3 types
-                    # Overpass API query for places
-                    overpass_query = f"""
-                    [out:json][timeout:15];
-                    (
-                      node["{place_type['key']}"="{place_type['value']}"](around:8000,{coordinates});
-                      way["{place_type['key']}"="{place_type['value']}"](around:8000,{coordinates});
-                    );
-                    out center meta;
-                    """
-                    
-                    try:
-                        response = await client.post(
-                            "https://overpass-api.de/api/interpreter",
-                            data=overpass_query,
-                            headers={"Content-Type": "text/plain"}
-                        )
-                        
-                        if response.status_code == 200:
-                            data = response.json()
-                            osm_places = self._process_osm_data(data, place_type['name'])
-                            places.extend(osm_places)
-                            
-                        if len(places) >= 5:  # Stop when we have enough places
-                            break
-                            
-                    except Exception as e:
-                        self.log_activity(f"Error querying Overpass API for {place_type['name']}: {e}")
-                        continue
-            
-            # Remove duplicates and limit results
-            unique_places = self._remove_duplicate_places(places)
-            return unique_places[:6]  # Return top 6 places
-            
-        except Exception as e:
-            self.log_activity(f"Error with OpenStreetMap: {e}")
-            return []
-    
     def _get_coordinates(self, location: str) -> str:
-        """Get coordinates for major Indonesian cities (no API required!)"""
-        # Comprehensive coordinates mapping for Indonesia
-        city_coords = {
-            # Jakarta & surrounding
-            "jakarta": "-6.2088,106.8456",
-            "bekasi": "-6.2383,106.9756", 
-            "tangerang": "-6.1783,106.6319",
-            "depok": "-6.4025,106.7942",
-            "bogor": "-6.5971,106.8060",
-            
-            # West Java
-            "bandung": "-6.9175,107.6191",
-            "cirebon": "-6.7063,108.5570",
-            "sukabumi": "-6.9218,106.9270",
-            "tasikmalaya": "-7.3506,108.2181",
-            
-            # Central Java
-            "semarang": "-6.9667,110.4167",
-            "yogyakarta": "-7.7956,110.3695",
-            "yogya": "-7.7956,110.3695",
-            "jogja": "-7.7956,110.3695",
-            "solo": "-7.5663,110.8405",
-            "surakarta": "-7.5663,110.8405",
-            
-            # East Java
-            "surabaya": "-7.2575,112.7521",
-            "malang": "-7.9666,112.6326",
-            "kediri": "-7.8167,112.0167",
-            "madiun": "-7.6298,111.5239",
-            
-            # North Sumatra
-            "medan": "3.5952,98.6722",
-            "pematangsiantar": "2.9595,99.0687",
-            
-            # South Sumatra
-            "palembang": "-2.9761,104.7754",
-            
-            # Riau
-            "pekanbaru": "0.5071,101.4478",
-            
-            # Lampung
-            "bandar lampung": "-5.3971,105.2946",
-            "lampung": "-5.3971,105.2946",
-            
-            # Bali
-            "denpasar": "-8.6705,115.2126",
-            "bali": "-8.6705,115.2126",
-            "ubud": "-8.5069,115.2624",
-            "sanur": "-8.6872,115.2620",
-            "kuta": "-8.7183,115.1686",
-            
-            # Other major cities
-            "makassar": "-5.1477,119.4327",
-            "manado": "1.4748,124.8421",
-            "balikpapan": "-1.2379,116.8529",
-            "pontianak": "-0.0263,109.3425"
-        }
-        
+        """Get coordinates for major Indonesian cities (no API required!), or ones geocoded earlier"""
         location_lower = location.lower().strip()
-        
-        # Direct match
-        if location_lower in city_coords:
-            return city_coords[location_lower]
-        
-        # Partial match (e.g., "ke bandung" -> "bandung")
-        for city, coords in city_coords.items():
-            if city in location_lower or location_lower in city:
-                return coords
+        coords = _match_city_coordinates(location_lower) or _GEOCODE_CACHE.get(location_lower)
+        if coords:
+            return coords
         
         # Default to Jakarta if location not found
         self.log_activity(f"Location '{location}' not found in database, defaulting to Jakarta")
-        return city_coords["jakarta"]
+        return _CITY_COORDS["jakarta"]
     
-    def _mood_to_osm_types(self, mood: str) -> List[Dict]:
-        """Map mood to OpenStreetMap place types for Indonesian context"""
-        
-        # Common place types for relaxation and recreation
-        base_types = [
-            {"key": "leisure", "value": "park", "name": "Taman"},
-            {"key": "amenity", "value": "cafe", "name": "Kafe"}, 
-            {"key": "tourism", "value": "attraction", "name": "Tempat Wisata"},
-            {"key": "leisure", "value": "garden", "name": "Kebun"},
-            {"key": "amenity", "value": "library", "name": "Perpustakaan"},
-            {"key": "leisure", "value": "fitness_centre", "name": "Pusat Kebugaran"},
-            {"key": "shop", "value": "mall", "name": "Mall"},
-            {"key": "tourism", "value": "museum", "name": "Museum"},
-            {"key": "amenity", "value": "restaurant", "name": "Restoran"},
-            {"key": "natural", "value": "beach", "name": "Pantai"}
-        ]
-        
-        mood_mapping = {
-            "stressed": [
-                {"key": "leisure", "value": "park", "name": "Taman"},
-                {"key": "tourism", "value": "attraction", "name": "Tempat Wisata"},
-                {"key": "amenity", "value": "cafe", "name": "Kafe"}
-            ],
-            "sedih": [
-                {"key": "amenity", "value": "cafe", "name": "Kafe"},
-                {"key": "amenity", "value": "library", "name": "Perpustakaan"},
-                {"key": "tourism", "value": "museum", "name": "Museum"}
-            ],
-            "bosan": [
-                {"key": "tourism", "value": "attraction", "name": "Tempat Wisata"},
-                {"key": "shop", "value": "mall", "name": "Mall"},
-                {"key": "amenity", "value": "restaurant", "name": "Restoran"}
-            ],
-            "lelah": [
-                {"key": "leisure", "value": "park", "name": "Taman"},
-                {"key": "amenity", "value": "cafe", "name": "Kafe"},
-                {"key": "leisure", "value": "garden", "name": "Kebun"}
-            ]
-        }
+    async def _geocode_location(self, location: str):
+        """Look up a location missing from the city table on Nominatim, caching the result for _get_coordinates"""
+        global _NOMINATIM_CLIENT
+        location_lower = location.lower().strip()
+        if not location_lower or _match_city_coordinates(location_lower) is not None or location_lower in _GEOCODE_CACHE:
+            return
         
-        return mood_mapping.get(mood.lower(), base_types[:3])
+        async with _GEOCODE_LOCK:
+            if location_lower in _GEOCODE_CACHE:
+                return  # Resolved while we waited
+            if _NOMINATIM_CLIENT is None:
+                _NOMINATIM_CLIENT = httpx.AsyncClient(
+                    base_url="https://nominatim.openstreetmap.org",
+                    headers={
+                        "User-Agent": "HatiApp/1.0 (relaxation-assistant)",
+                        "Referer": settings.frontend_url
+                    },
+                    limits=httpx.Limits(max_connections=2, max_keepalive_connections=2),
+                    timeout=15.0
+                )
+            
+            try:
+                response = await self._paced_request(
+                    _NOMINATIM_CLIENT, _NOMINATIM_RATE, "GET", "/search",
+                    params={"q": location, "format": "json", "limit": 1, "countrycodes": "id"}
+                )
+                if response.status_code != 200:
+                    self.log_activity(f"Nominatim geocoding failed: {response.status_code}")
+                    return
+                results = orjson.loads(response.content)
+            except Exception as e:
+                self.log_activity(f"Error geocoding '{location}': {e}")
+                return
+            
+            # Not-found is cached too, so an unknown place isn't looked up again on every request
+            _GEOCODE_CACHE[location_lower] = f"{results[0]['lat']},{results[0]['lon']}" if results else ""
     
-    def _process_osm_data(self, data: Dict, place_type_name: str) -> List[Dict]:
-        """Process OpenStreetMap data into our standardized format"""
-        places = []
+    def _process_osm_data(self, data: Dict, amenity_names: Dict[str, str], location: str) -> List[Dict]:
+        """
+        Process an Overpass response into our standardized format
         
+        Places are grouped by the tag value they matched (keys of amenity_names, mapped to
+        the name to show), up to 5 each, in amenity_names' order.
+        """
+        by_type = {value: [] for value in amenity_names}
         for element in data.get("elements", []):
             tags = element.get("tags", {})
-            name = tags.get("name")
-            
-            if not name:
+            match = next(((key, tags[key]) for key in _OSM_TAG_KEYS if tags.get(key) in by_type), None)
+            if match is None or not tags.get("name"):
                 continue
-                
-            # Get coordinates (handle both nodes and ways)
-            if element.get("lat") and element.get("lon"):
-                lat, lon = element["lat"], element["lon"]
-            elif element.get("center"):
-                lat, lon = element["center"]["lat"], element["center"]["lon"]
-            else:
+            key, value = match
+            found = by_type[value]
+            if len(found) >= 5:
                 continue
             
-            # Build address from available tags
-            address_parts = []
-            if tags.get("addr:street"):
-                address_parts.append(tags["addr:street"])
-            if tags.get("addr:city"):
-                address_parts.append(tags["addr:city"])
-            
-            address = ", ".join(address_parts) if address_parts else "Alamat tidak tersedia"
+            point = element.get("center", element)  # Ways and relations come back with a center
+            if point.get("lat") is None or point.get("lon") is None:
+                continue
             
-            place_info = {
-                "name": name,
-                "type": place_type_name,
-                "address": address,
-                "description": tags.get("description", f"Tempat {place_type_name.lower()} yang bagus untuk relaksasi"),
+            found.append({
+                "name": tags["name"],
+                "type": amenity_names[value],
+                "address": self._build_address_osm(tags),
                 "coordinates": {
-                    "lat": lat,
-                    "lon": lon
+                    "lat": float(point["lat"]),
+                    "lng": float(point["lon"])
                 },
                 "source": "OpenStreetMap",
-                "additional_info": {
-                    "opening_hours": tags.get("opening_hours"),
-                    "phone": tags.get("phone"),
-                    "website": tags.get("website"),
-                    "amenity": tags.get("amenity"),
-                    "leisure": tags.get("leisure"),
-                    "tourism": tags.get("tourism")
-                }
-            }
-            
-            places.append(place_info)
+                "verified": True,
+                "description": f"{amenity_names[value]} di {location}",
+                "osm_id": element.get("id"),
+                "osm_type": element.get("type"),
+                "class": key,
+                "type_detail": value
+            })
         
-        return places
+        return [place for found in by_type.values() for place in found]
     
     def _remove_duplicate_places(self, places: List[Dict]) -> List[Dict]:
-        """Remove duplicate places based on name similarity"""
+        """Remove duplicate places based on name similarity - one pass over a set of normalized names"""
         unique_places = []
         seen_names = set()
         
         for place in places:
-            name_lower = place["name"].lower().strip()
-            if name_lower not in seen_names:
+            # Providers can return entries without a name - drop those rather than fail the whole list
+            name_lower = (place.get("name") or "").lower().strip()
+            if name_lower and name_lower not in seen_names:
                 seen_names.add(name_lower)
                 unique_places.append(place)
         
@@ -775,7 +921,7 @@ class RelaxationAgent(BaseAgent):
     async def _get_places_from_google_maps(self, location: str, mood: str, radius: int) -> List[Dict]:
         """Get places from Google Places API - verified business data"""
         try:
-            if not self.google_maps_api_key or self.google_maps_api_key == "your_google_maps_api_key_here":
+            if not self.google_maps_api_key:
                 return []
             
             self.log_activity(f"Using Google Places API for {location}")
@@ -788,62 +934,21 @@ class RelaxationAgent(BaseAgent):
             lat, lng = coordinates.split(',')
             
             # Map mood to Google Places types
-            place_types = self._mood_to_google_types(mood)
+            place_types = self._mood_to_google_types(mood)[:2]  # Limit API calls
             
-            places = []
+            client = await self._get_client()
+            # Types are independent - search them together, one round trip instead of two
+            results = await asyncio.gather(
+                *(self._search_google_place_type(client, place_type, lat, lng, radius) for place_type in place_types),
+                return_exceptions=True
+            )
             
-            async with httpx.AsyncClient(timeout=15.0) as client:
-                for place_type in place_types[:2]:  # Limit API calls
-                    try:
-                        # Google Places Nearby Search
-                        params = {
-                            "location": f"{lat},{lng}",
-                            "radius": radius,
-                            "type": place_type["type"],
-                            "key": self.google_maps_api_key,
-                            "language": "id"  # Indonesian language
-                        }
-                        
-                        response = await client.get(
-                            f"{self.places_base_url}/nearbysearch/json",
-                            params=params
-                        )
-                        
-                        if response.status_code == 200:
-                            data = response.json()
-                            
-                            if data.get("status") == "OK":
-                                for place in data.get("results", [])[:4]:
-                                    place_info = {
-                                        "name": place.get("name"),
-                                        "type": place_type["name"],
-                                        "address": place.get("vicinity", "Alamat tidak tersedia"),
-                                        "rating": place.get("rating", 0),
-                                        "price_level": place.get("price_level", 0),
-                                        "coordinates": {
-                                            "lat": place["geometry"]["location"]["lat"],
-                                            "lng": place["geometry"]["location"]["lng"]
-                                        },
-                                        "place_id": place.get("place_id"),
-                                        "photos": place.get("photos", []),
-                                        "opening_hours": place.get("opening_hours", {}),
-                                        "source": "Google Places API",
-                                        "verified": True,
-                                        "description": f"{place_type['name']} yang verified oleh Google"
-                                    }
-                                    places.append(place_info)
-                            else:
-                                self.log_activity(f"Google Places API error: {data.get('status')}")
-                                
-                        elif response.status_code == 403:
-                            self.log_activity("Google Places API: Invalid API key or quota exceeded")
-                            break
-                        else:
-                            self.log_activity(f"Google Places API HTTP error: {response.status_code}")
-                            
-                    except Exception as e:
-                        self.log_activity(f"Error with Google Places type {place_type['name']}: {e}")
-                        continue
+            places = []
+            for place_type, result in zip(place_types, results):
+                if isinstance(result, Exception):
+                    self.log_activity(f"Error with Google Places type {place_type['name']}: {result}")
+                else:
+                    places.extend(result)
             
             return places
             
@@ -851,129 +956,58 @@ class RelaxationAgent(BaseAgent):
             self.log_activity(f"Google Places API completely failed: {e}")
             return []
     
-    def _mood_to_google_types(self, mood: str) -> List[Dict]:
-        """Map mood to Google Places API types"""
-        
-        google_types = {
-            "stressed": [
-                {"type": "park", "name": "Taman"},
-                {"type": "spa", "name": "Spa"},
-                {"type": "cafe", "name": "Kafe"}
-            ],
-            "sedih": [
-                {"type": "cafe", "name": "Kafe"},
-                {"type": "museum", "name": "Museum"},
-                {"type": "book_store", "name": "Toko Buku"}
-            ],
-            "bored": [
-                {"type": "shopping_mall", "name": "Mall"},
-                {"type": "tourist_attraction", "name": "Tempat Wisata"},
-                {"type": "amusement_park", "name": "Tempat Hiburan"}
-            ],
-            "lelah": [
-                {"type": "park", "name": "Taman"},
-                {"type": "spa", "name": "Spa"},
-                {"type": "cafe", "name": "Kafe"}
-            ]
+    async def _search_google_place_type(self, client: httpx.AsyncClient, place_type: Dict, lat: str, lng: str, radius: int) -> List[Dict]:
+        """Google Places Nearby Search for one place type"""
+        params = {
+            "location": f"{lat},{lng}",
+            "radius": radius,
+            "type": place_type["type"],
+            "key": self.google_maps_api_key,
+            "language": "id"  # Indonesian language
         }
         
-        return google_types.get(mood.lower(), google_types["stressed"])
-    
-    async def _get_places_from_osm(self, location: str, mood: str) -> List[Dict]:
-        """Fallback: Get places using OpenStreetMap Overpass API (FREE)"""
-        try:
-            self.log_activity(f"Using OpenStreetMap fallback for location: {location}")
-            
-            # Simple coordinate mapping for major Indonesian cities
-            city_coords = {
-                "jakarta": "-6.2088,106.8456",
-                "bandung": "-6.9175,107.6191", 
-                "surabaya": "-7.2575,112.7521",
-                "yogyakarta": "-7.7956,110.3695",
-                "medan": "3.5952,98.6722",
-                "semarang": "-6.9667,110.4167",
-                "palembang": "-2.9761,104.7754",
-                "makassar": "-5.1477,119.4327",
-                "bali": "-8.4095,115.1889",
-                "denpasar": "-8.4095,115.1889"
-            }
-            
-            # Find coordinates for the location
-            location_lower = location.lower()
-            coordinates = None
-            for city, coords in city_coords.items():
-                if city in location_lower:
-                    coordinates = coords
-                    break
-            
-            if not coordinates:
-                coordinates = city_coords["jakarta"]  # Default to Jakarta
-            
-            # Map mood to place types for OpenStreetMap
-            place_types = {
-                "stressed": ["park", "garden", "library"],
-                "anxious": ["park", "cafe", "bookstore"],
-                "sad": ["cafe", "museum", "art_gallery"],
-                "tired": ["spa", "park", "cafe"],
-                "overwhelmed": ["park", "library", "quiet"]
-            }
-            
-            mood_types = place_types.get(mood.lower(), ["park", "cafe"])
-            
-            places = []
-            
-            async with httpx.AsyncClient() as client:
-                for place_type in mood_types[:2]:  # Limit to 2 types
-                    # Overpass query for different amenities
-                    overpass_query = f"""
-                    [out:json][timeout:25];
-                    (
-                      node["amenity"="{place_type}"](around:5000,{coordinates});
-                      node["leisure"="{place_type}"](around:5000,{coordinates});
-                      node["tourism"="{place_type}"](around:5000,{coordinates});
-                    );
-                    out body;
-                    """
-                    
-                    try:
-                        response = await client.post(
-                            "https://overpass-api.de/api/interpreter",
-                            data=overpass_query,
-                            timeout=10.0
-                        )
-                        
-                        if response.status_code == 200:
-                            data = response.json()
-                            
-                            for element in data.get("elements", [])[:3]:
-                                tags = element.get("tags", {})
-                                name = tags.get("name", "Unknown Place")
-                                
-                                if name and name != "Unknown Place":
-                                    places.append({
-                                        "name": name,
-                                        "type": place_type,
-                                        "rating": None,  # OSM doesn't have ratings
-                                        "address": self._build_address_osm(tags),
-                                        "open_now": None,
-                                        "place_id": f"osm_{element.get('id')}",
-                                        "location": {
-                                            "lat": element.get("lat"),
-                                            "lng": element.get("lon")
-                                        },
-                                        "source": "OpenStreetMap"
-                                    })
-                    except Exception as e:
-                        self.log_activity(f"Error with OSM query for {place_type}: {e}", "ERROR")
-                        continue
-            
-            self.log_activity(f"Found {len(places)} places from OpenStreetMap")
-            return places[:5]
-            
-        except Exception as e:
-            self.log_activity(f"Error with OpenStreetMap fallback: {e}", "ERROR")
+        response = await client.get(
+            f"{self.places_base_url}/nearbysearch/json",
+            params=params
+        )
+        
+        if response.status_code == 403:
+            self.log_activity("Google Places API: Invalid API key or quota exceeded")
             return []
-
+        if response.status_code != 200:
+            self.log_activity(f"Google Places API HTTP error: {response.status_code}")
+            return []
+        
+        data = orjson.loads(response.content)
+        if data.get("status") != "OK":
+            self.log_activity(f"Google Places API error: {data.get('status')}")
+            return []
+        
+        return [
+            {
+                "name": place.get("name"),
+                "type": place_type["name"],
+                "address": place.get("vicinity", "Alamat tidak tersedia"),
+                "rating": place.get("rating", 0),
+                "price_level": place.get("price_level", 0),
+                "coordinates": {
+                    "lat": place["geometry"]["location"]["lat"],
+                    "lng": place["geometry"]["location"]["lng"]
+                },
+                "place_id": place.get("place_id"),
+                "photos": place.get("photos", []),
+                "opening_hours": place.get("opening_hours", {}),
+                "source": "Google Places API",
+                "verified": True,
+                "description": f"{place_type['name']} yang verified oleh Google"
+            }
+            for place in data.get("results", [])[:4]
+        ]
+    
+    def _mood_to_google_types(self, mood: str) -> List[Dict]:
+        """Map mood to Google Places API types"""
+        return list(_GOOGLE_TYPES.get(mood.lower(), _GOOGLE_TYPES["stressed"]))
+    
     def _build_address_osm(self, tags: Dict) -> str:
         """Build address from OSM tags"""
         address_parts = []
@@ -5,12 +5,16 @@ Base Agent Class for Hati Multi-Agent System
 from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional
 import logging
+import math
 
 logger = logging.getLogger(__name__)
 
 class BaseAgent(ABC):
     """Base class for all agents in the Hati system"""
     
+    # Subclasses that declare their own __slots__ get no per-instance __dict__
+    __slots__ = ("name", "logger")
+    
     def __init__(self, name: str):
         self.name = name
         self.logger = logging.getLogger(f"agent.{name}")
@@ -41,14 +45,24 @@ class BaseAgent(ABC):
         """
         return True
     
-    def log_activity(self, message: str, level: str = "INFO"):
-        """Log agent activity"""
-        if level.upper() == "ERROR":
-            self.logger.error(f"[{self.name}] {message}")
-        elif level.upper() == "WARNING":
-            self.logger.warning(f"[{self.name}] {message}")
+    def _rate_limited_response(self, retry_after: float) -> Dict[str, Any]:
+        """Envelope telling the caller an upstream API is rate limited and when to try again"""
+        return {"ok": False, "code": "agent.rate_limited", "retry_after": math.ceil(retry_after)}
+    
+    def log_activity(self, message: str, *args: Any, level: str = "INFO"):
+        """
+        Log agent activity
+        
+        Extra args are %-formatted into message lazily, only if the record is emitted,
+        e.g. log_activity("Reflection conversation: mood: %s", mood).
+        """
+        level = level.upper()
+        levelno = logging.ERROR if level == "ERROR" else logging.WARNING if level == "WARNING" else logging.INFO
+        if args:
+            self.logger.log(levelno, "[%s] " + message, self.name, *args)
         else:
-            self.logger.info(f"[{self.name}] {message}")
+            # Pre-formatted message - keep any literal % in it out of the format string
+            self.logger.log(levelno, "[%s] %s", self.name, message)
 
 class ManagerAgent:
     """
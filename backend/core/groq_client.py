@@ -4,14 +4,9 @@ Provides high-speed inference using Groq Cloud API
 """
 
 import asyncio
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Dict, List, Optional, Any
 from groq import Groq
-import sys
-import os
-
-# Add project root to path for config imports
-project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-sys.path.append(project_root)
+from pydantic import BaseModel, Field, ValidationError
 
 from config.settings import settings
 import json
@@ -19,6 +14,13 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+class _DelegationReply(BaseModel):
+    """Expected JSON from the delegation prompt - parsed and shape-checked in one pass"""
+    agent: str = "reflection"
+    mood: str = "neutral"
+    parameters: Dict[str, Any] = Field(default_factory=dict)
+    reasoning: str = ""
+
 class GroqClient:
     """High-speed LLM client using Groq Cloud API"""
     
@@ -69,6 +71,42 @@ class GroqClient:
             logger.error(f"Error in Groq completion: {e}")
             raise
     
+    async def stream_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 1000,
+        temperature: float = 0.7
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion from Groq, yielding content deltas as they arrive
+        
+        The sync client's stream is read one chunk per worker-thread hop, so the
+        first tokens reach the caller without waiting for the whole completion.
+        """
+        stream = await asyncio.to_thread(
+            lambda: self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                stream=True
+            )
+        )
+        try:
+            while True:
+                chunk = await asyncio.to_thread(next, stream, None)
+                if chunk is None:
+                    break
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    yield delta
+        except Exception as e:
+            logger.error(f"Error in Groq streaming completion: {e}")
+            raise
+        finally:
+            # Release the connection if the consumer stopped early
+            stream.close()
+    
     async def analyze_and_delegate(self, user_message: str) -> Dict[str, Any]:
         """
         First LLM call: Analyze user message and decide which specialist agent to call
@@ -143,8 +181,8 @@ class GroqClient:
         )
         
         try:
-            return json.loads(response)
-        except json.JSONDecodeError:
+            return _DelegationReply.model_validate_json(response).model_dump()
+        except ValidationError:
             logger.error(f"Failed to parse delegation response: {response}")
             # Fallback to reflection agent if parsing fails
             return {
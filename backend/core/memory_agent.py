@@ -5,10 +5,15 @@ Extends the original base agent with database-backed memory
 
 from ..core.base_agent import BaseAgent
 from ..database.manager import get_db
+from cachetools import LFUCache, LRUCache
+from collections import deque
+from datetime import datetime
 from typing import Dict, List, Any, Optional
 import logging
 import hashlib
 import json
+import statistics
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +24,11 @@ class MemoryAgent(BaseAgent):
         super().__init__(agent_type)
         self.agent_type = agent_type
         self.db = get_db()
+        # Process-local front tier for cached responses: (expires_at, response) pairs,
+        # LFU-evicted so frequently requested keys survive when the cache is full
+        self._response_cache = LFUCache(maxsize=1024)
+        # Recent lookup times per cache key, used to size TTLs to how often each key is reused
+        self._key_lookups = LRUCache(maxsize=4096)
     
     def remember(self, session_id: str, key: str, value: Any, importance: int = 5):
         """Store a memory for this user and agent"""
@@ -88,21 +98,77 @@ class MemoryAgent(BaseAgent):
         params_str = json.dumps(request_params, sort_keys=True)
         return f"{self.agent_type}_{hashlib.md5(params_str.encode()).hexdigest()}"
     
-    def get_cached_response(self, cache_key: str) -> Optional[Dict]:
-        """Get cached API response"""
+    def get_cached_response(self, cache_key: str, record_lookup: bool = True) -> Optional[Dict]:
+        """
+        Get cached API response, checking the in-process tier before the database
+        
+        Pass record_lookup=False for internal probes (e.g. cache prewarming) so they
+        don't count as user lookups in the adaptive TTL history.
+        """
+        if record_lookup:
+            self._record_lookup(cache_key)
+        
+        entry = self._response_cache.get(cache_key)
+        if entry is not None:
+            expires_at, response = entry
+            if time.monotonic() < expires_at:
+                return dict(response)  # Callers annotate the result, keep the cached copy clean
+            self._response_cache.pop(cache_key, None)
+        
         try:
-            return self.db.get_cached_response(cache_key)
+            entry = self.db.get_cached_entry(cache_key)
         except Exception as e:
             logger.error(f"Failed to get cached response: {e}")
             return None
+        if entry is None:
+            return None
+        
+        # Promote database hits for the rest of their TTL so repeat lookups stay in-process
+        response, expires_at = entry
+        remaining = (expires_at - datetime.now()).total_seconds()
+        if remaining > 0:
+            self._response_cache[cache_key] = (time.monotonic() + remaining, dict(response))
+        return response
     
     def cache_response(self, cache_key: str, response: Dict, ttl_hours: int = 24):
         """Cache API response"""
+        self._response_cache[cache_key] = (time.monotonic() + ttl_hours * 3600, dict(response))
         try:
             self.db.cache_response(cache_key, response, ttl_hours)
         except Exception as e:
             logger.error(f"Failed to cache response: {e}")
     
+    def adaptive_ttl_hours(self, cache_key: str, default_hours: float) -> float:
+        """
+        Pick a TTL from how often this key is requested
+        
+        The TTL shrinks as the median gap between recent lookups grows: keys requested
+        every 15 minutes or more often get the 12 hour maximum, keys reused only every
+        12 hours or less often get the 15 minute minimum, and gaps in between scale
+        inversely. Hot keys stay cached, rarely reused ones expire early. Keys without
+        enough history use default_hours.
+        """
+        lookups = self._key_lookups.get(cache_key)
+        if not lookups or len(lookups) < 2:
+            return default_hours
+        
+        gaps = [later - earlier for earlier, later in zip(lookups, list(lookups)[1:])]
+        median_gap = max(statistics.median(gaps), 1.0)
+        ttl_seconds = min(max(43200 * 900 / median_gap, 900), 43200)
+        return ttl_seconds / 3600
+    
+    def _record_lookup(self, cache_key: str):
+        """
+        Remember when a cache key was requested (last 8 lookups per key)
+        
+        Kept in-process only - this runs on every lookup, including in-process hits,
+        so it must not touch SQLite on the event loop. History restarts with the process.
+        """
+        lookups = self._key_lookups.get(cache_key)
+        if lookups is None:
+            lookups = self._key_lookups[cache_key] = deque(maxlen=8)
+        lookups.append(time.time())
+    
     def _extract_preferences(self, session_id: str, user_request: str, response: Dict):
         """Extract and store user preferences from successful interactions"""
         # This will be overridden by specific agents to extract relevant preferences
@@ -0,0 +1,97 @@
+"""
+Client-side rate limiting for external APIs
+Token buckets let short bursts through while holding the long-run request rate
+"""
+
+import asyncio
+import time
+from typing import Optional
+
+
+class RateLimited(Exception):
+    """Raised instead of queueing behind a bucket that is paused by an upstream rate limit"""
+    
+    def __init__(self, retry_after: float):
+        super().__init__(f"rate limited, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Async token bucket: up to `capacity` calls at once, refilled at `rate` calls per second"""
+    
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()  # Waiters are served in arrival order
+    
+    def _refill(self, now: float):
+        if now <= self._updated:
+            return  # Still inside a pause - nothing has been earned yet
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+    
+    async def acquire(self):
+        """Take one token, sleeping until one is available"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+    
+    def pause(self, seconds: float):
+        """Hold every caller for `seconds` (e.g. a 429's Retry-After) and drop any saved burst"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = min(self._tokens, 1)  # One call may probe as soon as the pause ends
+        self._updated = self._paused_until  # Refill restarts once the pause is over
+    
+    def cooldown_remaining(self) -> float:
+        """Seconds left on the current pause, 0 when callers aren't being held"""
+        return max(0.0, self._paused_until - time.monotonic())
+    
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class AdaptiveTokenBucket(TokenBucket):
+    """
+    Token bucket that finds the rate an API tolerates by itself
+    
+    The rate grows while calls succeed - by the larger of `step` and `growth` times
+    the current rate, up to `rate_max` - and halves on every throttled or failed call,
+    down to `rate_min`.
+    """
+    
+    def __init__(self, rate: float, capacity: float, rate_min: float, rate_max: Optional[float] = None,
+                 step: float = 0.05, growth: float = 0.1):
+        super().__init__(rate, capacity)
+        self.rate_min = rate_min
+        self.rate_max = rate if rate_max is None else rate_max
+        self.step = step
+        self.growth = growth
+    
+    def on_success(self):
+        """Speed up a little after a call went through"""
+        self._refill(time.monotonic())  # Settle tokens earned at the old rate first
+        self.rate = min(self.rate_max, self.rate + max(self.step, self.growth * self.rate))
+    
+    def on_failure(self, retry_after: Optional[float] = None):
+        """Halve the rate and drop the saved burst after a 429 or upstream error, honoring Retry-After if given"""
+        self._refill(time.monotonic())
+        self.rate = max(self.rate_min, self.rate / 2)
+        self._tokens = 0
+        if retry_after:
+            self.pause(retry_after)
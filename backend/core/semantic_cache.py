@@ -0,0 +1,81 @@
+"""
+Semantic cache for LLM replies
+Reuses a cached reply when a new prompt means the same as an earlier one,
+matched by cosine similarity of sentence embeddings
+"""
+
+import asyncio
+import logging
+from typing import Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticCache:
+    """Nearest-neighbour lookup over prompt embeddings, with entries tagged so e.g. moods never mix"""
+    
+    def __init__(self, model_name: str, threshold: float = 0.92, max_entries: int = 5000):
+        self.model_name = model_name
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._model = None
+        self._index = None
+        self._entries: List[Tuple[str, Any]] = []  # (tag, payload), parallel to the index rows
+        self._load_lock = asyncio.Lock()
+        self.enabled = True
+    
+    def _load(self):
+        # Heavy optional dependencies, imported only when the cache is switched on
+        import faiss
+        from sentence_transformers import SentenceTransformer
+        
+        self._model = SentenceTransformer(self.model_name)
+        self._index = faiss.IndexFlatIP(self._model.get_sentence_embedding_dimension())
+    
+    async def _ensure_loaded(self) -> bool:
+        if self._model is None and self.enabled:
+            async with self._load_lock:
+                if self._model is None and self.enabled:
+                    try:
+                        await asyncio.to_thread(self._load)
+                    except Exception as e:
+                        logger.warning(f"Semantic cache disabled, model could not be loaded: {e}")
+                        self.enabled = False
+        return self.enabled
+    
+    def _embed(self, text: str):
+        # Normalized, so inner product on the flat index is cosine similarity
+        return self._model.encode([text], normalize_embeddings=True).astype("float32")
+    
+    async def lookup(self, text: str, tag: str) -> Tuple[Optional[Any], Any]:
+        """
+        Find a cached payload for text under tag
+        
+        Returns (payload or None, embedding) - pass the embedding to add() on a miss
+        so the prompt isn't embedded twice.
+        """
+        if not await self._ensure_loaded():
+            return None, None
+        
+        embedding = await asyncio.to_thread(self._embed, text)
+        if self._entries:
+            # A few neighbours, since the closest one may carry another tag
+            scores, rows = self._index.search(embedding, min(5, len(self._entries)))
+            for score, row in zip(scores[0], rows[0]):
+                if score < self.threshold:
+                    break
+                entry_tag, payload = self._entries[row]
+                if entry_tag == tag:
+                    return payload, embedding
+        return None, embedding
+    
+    def add(self, embedding, tag: str, payload: Any):
+        """Store payload for a prompt embedding returned by lookup()"""
+        if embedding is None:
+            return
+        if len(self._entries) >= self.max_entries:
+            # Flat indexes have no cheap eviction - start over rather than grow without bound
+            self._index.reset()
+            self._entries.clear()
+        self._index.add(embedding)
+        self._entries.append((tag, payload))
@@ -0,0 +1,91 @@
+"""
+Per-user sliding-window rate limiting in Redis
+Counts requests in fixed windows and weighs the previous window by how much of it
+still overlaps the sliding one, so bursts at a window boundary can't double the limit
+"""
+
+import logging
+import math
+import time
+from typing import Tuple
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Read both windows, and count the request only if the weighted total stays under the
+# limit - in one script so concurrent requests from a user can't all slip past the check
+_ALLOW_SCRIPT = """
+local curr = tonumber(redis.call('GET', KEYS[1]) or '0')
+local prev = tonumber(redis.call('GET', KEYS[2]) or '0')
+local limit = tonumber(ARGV[1])
+if prev * (1 - tonumber(ARGV[3])) + curr >= limit then
+    return {0, curr, prev}
+end
+redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], ARGV[2] * 2)
+return {1, curr + 1, prev}
+"""
+
+_redis = None
+_allow_script = None
+_unavailable = False  # Set once Redis turns out to be missing, so we stop trying
+
+
+def _get_script():
+    """Lazily connect to Redis and register the script - None when rate limiting is off"""
+    global _redis, _allow_script, _unavailable
+    if _allow_script is None and settings.redis_url and not _unavailable:
+        try:
+            # Optional dependency, only needed when REDIS_URL is set
+            import redis.asyncio as redis
+        except ImportError as e:
+            logger.warning(f"Per-user rate limiting disabled, redis could not be imported: {e}")
+            _unavailable = True
+            return None
+        _redis = redis.from_url(settings.redis_url)
+        _allow_script = _redis.register_script(_ALLOW_SCRIPT)
+    return _allow_script
+
+
+async def allow(user_id: str, key: str, limit: int, window_s: int) -> Tuple[bool, float]:
+    """
+    Count one request by user_id against `limit` per `window_s` seconds for key
+    
+    Returns (allowed, retry_after seconds). Fails open - without Redis, or when
+    it can't be reached, every request is allowed.
+    """
+    script = _get_script()
+    if script is None:
+        return True, 0.0
+    
+    now = time.time()
+    window = int(now // window_s)
+    elapsed = now / window_s - window  # Fraction of the current window already gone
+    try:
+        allowed, curr, prev = await script(
+            keys=[f"ratelimit:{key}:{user_id}:{window}", f"ratelimit:{key}:{user_id}:{window - 1}"],
+            args=[limit, window_s, elapsed]
+        )
+    except Exception as e:
+        logger.warning(f"Rate limit check for {key} failed, allowing request: {e}")
+        return True, 0.0
+    
+    if allowed:
+        return True, 0.0
+    
+    # Wait until the previous window's share has faded enough, or the current window is over
+    if curr < limit and prev:
+        retry_after = (1 - (limit - curr) / prev - elapsed) * window_s
+    else:
+        retry_after = (1 - elapsed) * window_s
+    return False, max(1.0, math.ceil(retry_after))
+
+
+async def aclose():
+    """Close the Redis connection pool"""
+    global _redis, _allow_script
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+        _allow_script = None
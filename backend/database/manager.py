@@ -5,9 +5,10 @@ Handles user conversations, caching, and agent memory
 
 import sqlite3
 import json
+import orjson
 import os
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 import logging
 from contextlib import contextmanager
 from pathlib import Path
@@ -206,7 +207,18 @@ class DatabaseManager:
                 WHERE cache_key = ? AND expires_at > CURRENT_TIMESTAMP
             """, (cache_key,))
             result = cursor.fetchone()
-            return json.loads(result[0]) if result else None
+            return orjson.loads(result[0]) if result else None
+
+    def get_cached_entry(self, cache_key: str) -> Optional[Tuple[Dict, datetime]]:
+        """Get cached API response and its expiry time if not expired"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT response_data, expires_at FROM api_cache 
+                WHERE cache_key = ? AND expires_at > CURRENT_TIMESTAMP
+            """, (cache_key,))
+            result = cursor.fetchone()
+            return (orjson.loads(result[0]), datetime.fromisoformat(result[1])) if result else None
 
     def cache_response(self, cache_key: str, data: Dict, ttl_hours: int = 24):
         """Cache API response with TTL"""
@@ -218,7 +230,7 @@ class DatabaseManager:
                 INSERT OR REPLACE INTO api_cache 
                 (cache_key, response_data, expires_at)
                 VALUES (?, ?, ?)
-            """, (cache_key, json.dumps(data), expires_at))
+            """, (cache_key, orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode(), expires_at))
             conn.commit()
 
     def cleanup_expired_cache(self):
@@ -3,27 +3,26 @@ FastAPI Application for Hati Multi-Agent System
 """
 
 from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 # from fastapi.staticfiles import StaticFiles  # Not needed for streaming URLs
 from pydantic import BaseModel
 from typing import Dict, Any, Optional
+import asyncio
 import logging
-import sys
-import os
+import orjson
 import uuid
 from datetime import datetime
 
-# Add the project root to the Python path
-project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-sys.path.append(project_root)
-
+# Imports resolve from the project root - start the app there (uvicorn backend.main:app)
 from config.settings import settings
 from backend.core.groq_client import groq_client
 from backend.core.base_agent import ManagerAgent
+from backend.core import sliding_window
 from backend.agents.music_agent import MusicAgent
 from backend.agents.entertainment_agent import EntertainmentAgent
 from backend.agents.relaxation_agent import RelaxationAgent
-from backend.agents.reflection_agent import ReflectionAgent
+from backend.agents.reflection_agent import reflection_agent
 from backend.database.manager import init_database, get_db
 
 # Configure logging
@@ -42,7 +41,8 @@ logger.info("Database initialized successfully")
 app = FastAPI(
     title="Hati - AI Mood Management",
     description="Multi-agent platform for mood management with memory and caching",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
@@ -65,10 +65,28 @@ manager_agent = ManagerAgent(groq_client)
 manager_agent.register_specialist("music", MusicAgent())
 manager_agent.register_specialist("entertainment", EntertainmentAgent())
 manager_agent.register_specialist("relaxation", RelaxationAgent())
-manager_agent.register_specialist("reflection", ReflectionAgent())
+manager_agent.register_specialist("reflection", reflection_agent)
 
 logger.info("Hati Multi-Agent System initialized successfully")
 
+@app.on_event("startup")
+async def startup_event():
+    """Start background Spotify token refresh and warm the music cache without delaying startup"""
+    manager_agent.specialists["music"].start_token_refresh()
+    if settings.music_prewarm_enabled:
+        app.state.music_prewarm_task = asyncio.create_task(manager_agent.specialists["music"].prewarm_cache())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release shared resources (pooled HTTP clients, the rate limit Redis pool) held by the app"""
+    for agent_type, agent in manager_agent.specialists.items():
+        if hasattr(agent, 'aclose'):
+            try:
+                await agent.aclose()
+            except Exception as e:
+                logger.error(f"Error closing {agent_type} agent: {e}")
+    await sliding_window.aclose()
+
 # Pydantic models for API
 class ChatMessage(BaseModel):
     message: str
@@ -117,7 +135,9 @@ async def health_check():
         "status": "healthy",
         "version": "1.0.0",
         "agents_registered": len(manager_agent.specialists),
-        "groq_connected": groq_connected
+        "groq_connected": groq_connected,
+        # Place providers without credentials are skipped - explains empty Foursquare/Google results
+        "place_providers": manager_agent.specialists["relaxation"].provider_status()
     }
 
 @app.get("/music/tracks")
@@ -172,6 +192,42 @@ async def get_background_music_tracks():
         logger.error(f"Error getting music tracks: {e}")
         raise HTTPException(status_code=500, detail="Error loading music tracks")
 
+@app.get("/music/artist-stream")
+async def stream_artist_music(artist: str):
+    """Stream artist-based recommendations as server-sent events - top tracks first, related tracks as they arrive"""
+    music_agent = manager_agent.specialists["music"]
+    if not music_agent.spotify_enabled:
+        raise HTTPException(status_code=503, detail="Spotify is not configured")
+    
+    async def events():
+        try:
+            async for stage in music_agent.stream_artist_recommendations(artist):
+                yield f"data: {orjson.dumps(stage).decode()}\n\n"
+        except Exception as e:
+            logger.error(f"Error streaming music for '{artist}': {e}")
+            yield f"data: {orjson.dumps({'type': 'error', 'detail': 'Music search failed'}).decode()}\n\n"
+        yield 'data: {"type": "done"}\n\n'
+    
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+@app.get("/reflection/stream")
+async def stream_reflection(message: str, mood: str = "neutral", session_id: str = "default"):
+    """Stream the reflection reply as server-sent events - text deltas as Groq generates them"""
+    reflection_agent = manager_agent.specialists["reflection"]
+    
+    async def events():
+        try:
+            async for delta in reflection_agent.stream_conversational_response(
+                message, {"mood": mood, "session_id": session_id}
+            ):
+                yield f"data: {orjson.dumps({'type': 'delta', 'text': delta}).decode()}\n\n"
+        except Exception as e:
+            logger.error(f"Error streaming reflection for session {session_id}: {e}")
+            yield f"data: {orjson.dumps({'type': 'error', 'detail': 'Reflection failed'}).decode()}\n\n"
+        yield 'data: {"type": "done"}\n\n'
+    
+    return StreamingResponse(events(), media_type="text/event-stream")
+
 @app.post("/chat-enhanced", response_model=Dict[str, Any])
 async def chat_enhanced_endpoint(request: Request):
     """
@@ -419,8 +475,9 @@ async def cleanup_database():
 
 if __name__ == "__main__":
     import uvicorn
+    # Run as a module from the project root: python -m backend.main
     uvicorn.run(
-        "main:app",
+        "backend.main:app",
         host=settings.app_host,
         port=settings.app_port,
         reload=settings.debug
@@ -10,6 +10,9 @@ class Settings(BaseSettings):
     # Spotify Settings
     spotify_client_id: str
     spotify_client_secret: str
+    music_prewarm_enabled: bool = False  # Warm the recommendation cache for common moods at startup (~10 Spotify calls per boot)
+    spotify_max_concurrency: int = 5
+    spotify_requests_per_minute: int = 180  # Sustained Web API rate; bursts of up to 10s worth pass straight through
     
     # Google Maps Settings
     google_maps_api_key: str
@@ -22,9 +25,20 @@ class Settings(BaseSettings):
     
     # Giphy Settings
     giphy_api_key: str
+    giphy_max_concurrency: int = 10
     
     # TMDb Settings
     tmdb_api_key: str
+    tmdb_max_concurrency: int = 5
+    
+    # Reflection Settings - semantic reply cache needs sentence-transformers and faiss-cpu
+    reflection_semantic_cache_enabled: bool = False
+    reflection_semantic_cache_model: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+    reflection_semantic_cache_threshold: float = 0.92
+    
+    # Per-user rate limiting - needs redis, and is off unless REDIS_URL is set
+    redis_url: Optional[str] = None
+    relaxation_requests_per_minute: int = 30
     
     # Application Settings
     app_host: str = "0.0.0.0"